@@ -64,6 +64,18 @@ DUPLICATE_REACTIONS = [
     "Nice try, but we're not downloading the same thing twice. We have STANDARDS.",
 ]
 
+# ============================================================================
+# UNCHANGED MESSAGES (--refresh found nothing new)
+# ============================================================================
+
+UNCHANGED_REACTIONS = [
+    "304 Not Modified! Same PDF, same vibes. Zero bytes wasted!",
+    "Checked with the server. Nothing new. Our copy is PERFECT.",
+    "*taps ETag* Yep, still fresh. Like a well-tuned clarinet.",
+    "No changes! The server and I are in PERFECT agreement for once!",
+    "Revalidated and UNBOTHERED. Next!",
+]
+
 # ============================================================================
 # FAILURE MESSAGES (404 / NOT FOUND)
 # ============================================================================
@@ -95,6 +107,53 @@ FAILURE_CONNECTION_REACTIONS = [
     "The server said 'no'! Well, actually it said nothing! Because timeout! GET IT?!",
 ]
 
+# ============================================================================
+# CACHED MISS MESSAGES (known 404s we didn't bother asking about)
+# ============================================================================
+
+CACHED_MISS_REACTIONS = [
+    "We asked last time. It was a 404. We are NOT asking again. We have DIGNITY.",
+    "Still not there, probably. I'm not even checking. I REMEMBER things.",
+    "*checks notes* Yep, this one's a known ghost. Moving on!",
+    "Fool me once, shame on you. 404 me twice? NOT HAPPENING.",
+    "The negative cache says NO. The negative cache is WISE.",
+]
+
+# ============================================================================
+# RETRY MESSAGES (transient failure, trying again)
+# ============================================================================
+
+RETRY_REACTIONS = [
+    "Hiccup! We'll try that again. PERSISTENCE is a virtue!",
+    "The internet blinked. We did NOT blink. Retrying!",
+    "*cracks knuckles* Round two. Let's GO.",
+    "If at first you don't succeed, wait a bit and try AGAIN.",
+    "Transient failure! Emphasis on TRANSIENT! Back in a sec!",
+]
+
+# ============================================================================
+# INVALID PDF MESSAGES (200 OK, but not a program)
+# ============================================================================
+
+INVALID_PDF_REACTIONS = [
+    "That's not a PDF. That's a WEB PAGE wearing a PDF costume!",
+    "The server said 200 OK and then handed us GARBAGE. Rude. Not saving it.",
+    "*sniffs bytes* ...nope. No %PDF- here. Into the bin it goes.",
+    "We almost saved a maintenance page as a concert program. ALMOST.",
+    "Half a PDF is worse than no PDF. We'll get the whole thing next time.",
+]
+
+# ============================================================================
+# RESOLVED NAME MESSAGES (found under another spelling)
+# ============================================================================
+
+RESOLVED_REACTIONS = [
+    "Wrong name, right band! Found it under its REAL name.",
+    "Same ensemble, different spelling. We see through the disguise!",
+    "Ah, THAT'S what they called it that year. Noted for next time.",
+    "*squints at URL* ...close enough. GOT IT.",
+]
+
 # ============================================================================
 # RATE LIMITING MESSAGES
 # ============================================================================
@@ -324,6 +383,12 @@ def get_duplicate_message(chaos: bool = False) -> str:
         return random.choice(CHAOS_DUPLICATE)
     return random.choice(DUPLICATE_REACTIONS)
 
+def get_unchanged_message(chaos: bool = False) -> str:
+    """Get a message for a file the server says hasn't changed."""
+    if chaos:
+        return random.choice(CHAOS_DUPLICATE)
+    return random.choice(UNCHANGED_REACTIONS)
+
 def get_404_message(chaos: bool = False) -> str:
     """Get a 404 failure message."""
     if chaos:
@@ -336,6 +401,30 @@ def get_connection_error_message(chaos: bool = False) -> str:
         return random.choice(CHAOS_FAILURE)
     return random.choice(FAILURE_CONNECTION_REACTIONS)
 
+def get_cached_miss_message(chaos: bool = False) -> str:
+    """Get a message for a 404 we remembered instead of re-requesting."""
+    if chaos:
+        return random.choice(CHAOS_FAILURE)
+    return random.choice(CACHED_MISS_REACTIONS)
+
+def get_retry_message(chaos: bool = False) -> str:
+    """Get a message for a job that's about to be retried."""
+    if chaos:
+        return random.choice(CHAOS_FAILURE)
+    return random.choice(RETRY_REACTIONS)
+
+def get_invalid_pdf_message(chaos: bool = False) -> str:
+    """Get a message for a response that turned out not to be a PDF."""
+    if chaos:
+        return random.choice(CHAOS_FAILURE)
+    return random.choice(INVALID_PDF_REACTIONS)
+
+def get_resolved_message(chaos: bool = False) -> str:
+    """Get a message for a program found under another spelling of the ensemble's name."""
+    if chaos:
+        return random.choice(CHAOS_SUCCESS)
+    return random.choice(RESOLVED_REACTIONS)
+
 def get_rate_limit_message() -> str:
     """Get a rate limiting message."""
     return random.choice(RATE_LIMIT_MESSAGES)
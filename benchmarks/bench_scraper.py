@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+SCRAPER BENCHMARK
+Drives scraper.py end-to-end against the local stand-in server and reports
+how fast it goes, so serial vs. concurrent modes can be compared (and
+throughput regressions caught) without touching midwestclinic.org.
+
+Each mode runs in its own fresh process with its own empty output directory,
+so peak RSS and on-disk state don't leak between modes.
+
+Usage:
+    python benchmarks/bench_scraper.py
+    python benchmarks/bench_scraper.py --years 2000-2023 --ensembles 60 --latency 0.2 \\
+        --mode "serial=--workers 1" --mode "workers16=--workers 16 --rate 40"
+    python benchmarks/bench_scraper.py --save baseline.json
+    python benchmarks/bench_scraper.py --compare baseline.json --tolerance 0.15
+"""
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+import stand_in_server
+
+DEFAULT_MODES = ["serial=--workers 1", "workers8=--workers 8"]
+
+# ============================================================================
+# CHILD: ONE MODE, ONE PROCESS
+# ============================================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(round(pct / 100 * len(ordered) + 0.5))))
+    return ordered[rank - 1]
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, if the platform tells us."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KB
+
+def run_child(base_url: str, output_dir: str, scraper_args: List[str]) -> dict:
+    """Run scraper.main() once with timing hooks and return the measurements."""
+    sys.path.insert(0, str(REPO_ROOT))
+    import scraper
+
+    scraper.BASE_URL = base_url
+    scraper.OUTPUT_DIR = output_dir
+
+    job_times = []
+    outcomes = {'success': 0, 'other': 0}
+    download_program = scraper.download_program
+
+    def timed_download_program(*args, **kwargs):
+        start = time.perf_counter()
+        ok = download_program(*args, **kwargs)
+        job_times.append(time.perf_counter() - start)
+        outcomes['success' if ok else 'other'] += 1
+        return ok
+
+    scraper.download_program = timed_download_program
+    sys.argv = ['scraper.py'] + scraper_args
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        scraper.main()
+        wall = time.perf_counter() - start
+
+    downloaded = sum(path.stat().st_size for path in Path(output_dir).glob('*/*.pdf'))
+    return {
+        'jobs': len(job_times),
+        'successes': outcomes['success'],
+        'wall_seconds': wall,
+        'jobs_per_second': len(job_times) / wall if wall else 0.0,
+        'bytes': downloaded,
+        'bytes_per_second': downloaded / wall if wall else 0.0,
+        'p50_ms': percentile(job_times, 50) * 1000,
+        'p99_ms': percentile(job_times, 99) * 1000,
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+
+# ============================================================================
+# PARENT: SERVER, MODES, REPORT
+# ============================================================================
+
+def parse_mode(spec: str):
+    """'name=--workers 4 --rate 20' -> ('name', ['--workers', '4', '--rate', '20'])"""
+    name, sep, flags = spec.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"mode must look like NAME=FLAGS, got {spec!r}")
+    return name, shlex.split(flags)
+
+def run_mode(name: str, flags: List[str], base_url: str, grid_args: List[str], rate: float) -> dict:
+    """Run one mode in a fresh interpreter with a fresh output directory."""
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as output_dir:
+        scraper_args = grid_args + ['--boring', '--no-miss-cache', '--rate', str(rate)] + flags
+        command = [sys.executable, __file__, '--child', base_url, output_dir, '--'] + scraper_args
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"mode {name!r} failed:\n{completed.stderr}")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['mode'] = name
+    result['flags'] = ' '.join(flags)
+    return result
+
+def format_rss(size: Optional[int]) -> str:
+    return "n/a" if size is None else f"{size / (1024 * 1024):.1f}"
+
+def print_report(results: List[dict]):
+    header = f"{'mode':<14}{'jobs':>6}{'wall s':>9}{'jobs/s':>9}{'MB/s':>8}{'p50 ms':>9}{'p99 ms':>9}{'RSS MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['mode']:<14}{r['jobs']:>6}{r['wall_seconds']:>9.2f}{r['jobs_per_second']:>9.2f}"
+              f"{r['bytes_per_second'] / (1024 * 1024):>8.2f}{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{format_rss(r['peak_rss_bytes']):>8}")
+
+def compare(results: List[dict], baseline_path: str, tolerance: float) -> bool:
+    """Flag modes whose jobs/s dropped more than `tolerance` below the baseline."""
+    with open(baseline_path, 'r') as f:
+        baseline = {r['mode']: r for r in json.load(f)['results']}
+
+    ok = True
+    print()
+    for r in results:
+        before = baseline.get(r['mode'])
+        if before is None or not before['jobs_per_second']:
+            print(f"{r['mode']}: no baseline")
+            continue
+        change = r['jobs_per_second'] / before['jobs_per_second'] - 1
+        regressed = change < -tolerance
+        ok = ok and not regressed
+        print(f"{r['mode']}: {change:+.1%} jobs/s vs baseline{'  <-- REGRESSION' if regressed else ''}")
+    return ok
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        base_url, output_dir = sys.argv[2], sys.argv[3]
+        print(json.dumps(run_child(base_url, output_dir, sys.argv[5:])))
+        return
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark scraper.py against a local stand-in server',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--years', default='2000-2009', help='Year range for the grid (default: 2000-2009)')
+    parser.add_argument('--ensembles', type=int, default=30, help='Synthetic ensembles in the grid (default: 30)')
+    parser.add_argument('--list', dest='ensemble_list', help='Use a real ensemble list instead of synthetic names')
+    parser.add_argument('--rate', type=float, default=50.0, help='Scraper --rate for every mode (default: 50)')
+    parser.add_argument('--mode', action='append', type=parse_mode,
+                        help='NAME=SCRAPER_FLAGS to run (repeatable; default: serial and 8 workers)')
+    parser.add_argument('--save', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON from --save to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed jobs/s drop vs. --compare baseline before failing (default: 0.1)')
+    stand_in_server.add_server_arguments(parser)
+    args = parser.parse_args()
+
+    modes = args.mode or [parse_mode(spec) for spec in DEFAULT_MODES]
+    server = stand_in_server.start_server(stand_in_server.config_from_args(args))
+
+    with tempfile.TemporaryDirectory(prefix="bench-grid-") as grid_dir:
+        ensemble_list = args.ensemble_list
+        if ensemble_list is None:
+            ensemble_list = str(Path(grid_dir) / 'ensembles.txt')
+            with open(ensemble_list, 'w') as f:
+                f.write('\n'.join(f"Ensemble{i:03d}" for i in range(args.ensembles)) + '\n')
+        grid_args = ['--years', args.years, '--list', ensemble_list]
+
+        print(f"Stand-in server: {server.base_url}")
+        print(f"Grid: --years {args.years} x {ensemble_list}\n")
+        results = []
+        for name, flags in modes:
+            requests_before, bytes_before = server.requests_served, server.bytes_served
+            result = run_mode(name, flags, server.base_url, grid_args, args.rate)
+            result['server_requests'] = server.requests_served - requests_before
+            result['server_bytes'] = server.bytes_served - bytes_before
+            results.append(result)
+
+    server.shutdown()
+    print_report(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'created': time.time(), 'argv': sys.argv[1:], 'results': results}, f, indent=2)
+        print(f"\nSaved to {args.save}")
+
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
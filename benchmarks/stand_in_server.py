@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+STAND-IN SERVER
+A local fake of the Midwest Clinic PDF archive, so we can benchmark (and
+abuse) the scraper without bothering midwestclinic.org.
+
+Serves /{year}/{year}_{ensemble}_Concert.pdf with:
+    - a configurable hit/404 ratio (deterministic per path, so reruns agree)
+    - log-normally distributed PDF sizes
+    - per-request latency with jitter
+    - injected 500s and mid-body connection drops
+    - "200 OK" HTML maintenance pages in place of PDFs
+    - throttling: 429 + Retry-After above a request rate
+    - HEAD, ETag/If-None-Match, Last-Modified, Range/If-Range
+    - optionally, saved archive listing pages from a directory (--pages), for
+      scraper.py --discover, with the same validators plus If-Modified-Since
+
+Usage:
+    python benchmarks/stand_in_server.py --port 8765 --hit-ratio 0.1 --latency 0.05
+    python benchmarks/stand_in_server.py --pages benchmarks/fixtures/archive --hit-ratio 1
+"""
+
+import argparse
+import hashlib
+import math
+import random
+import re
+import sys
+import threading
+import time
+from urllib.parse import unquote
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+PATH_PATTERN = re.compile(r"^/(?:.*/)?(\d{4})/(\d{4})_(.+)_Concert\.pdf$")
+MAINTENANCE_PAGE = b"<!DOCTYPE html><html><body><h1>Down for maintenance</h1></body></html>\n"
+LAST_MODIFIED = formatdate(time.time() - 86400, usegmt=True)
+
+# ============================================================================
+# SERVER CONFIGURATION
+# ============================================================================
+
+class ServerConfig:
+    """Knobs for how the fake archive behaves."""
+
+    def __init__(self, hit_ratio: float = 0.1, median_size: int = 512 * 1024, size_sigma: float = 0.8,
+                 max_size: int = 20 * 1024 * 1024, latency: float = 0.05, latency_jitter: float = 0.02,
+                 error_rate: float = 0.0, drop_rate: float = 0.0, bad_rate: float = 0.0,
+                 throttle_rps: Optional[float] = None, retry_after: int = 1, seed: int = 0,
+                 pages: Optional[str] = None):
+        self.hit_ratio = hit_ratio
+        self.median_size = median_size
+        self.size_sigma = size_sigma
+        self.max_size = max_size
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.bad_rate = bad_rate
+        self.throttle_rps = throttle_rps
+        self.retry_after = retry_after
+        self.seed = seed
+        self.pages = Path(pages).resolve() if pages else None
+
+    def _path_random(self, path: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{path}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
+    def body_for(self, path: str) -> Optional[bytes]:
+        """The PDF served at `path`, or None for a 404. Same answer every time."""
+        match = PATH_PATTERN.match(path)
+        if not match or match.group(1) != match.group(2):
+            return None
+        rng = self._path_random(path)
+        if rng.random() >= self.hit_ratio:
+            return None
+        size = int(self.median_size * math.exp(rng.gauss(0, self.size_sigma)))
+        size = max(64, min(self.max_size, size))
+        header = b"%PDF-1.4\n% stand-in program for " + path.encode() + b"\n"
+        trailer = b"\n%%EOF\n"
+        filler = hashlib.sha256(path.encode()).digest() * 2
+        repeats = max(0, size - len(header) - len(trailer)) // len(filler) + 1
+        return header + (filler * repeats)[:max(0, size - len(header) - len(trailer))] + trailer
+
+    def page_for(self, path: str) -> Optional[Path]:
+        """The saved HTML page served at `path` (a directory means its index.html), if there is one."""
+        if self.pages is None:
+            return None
+        page = (self.pages / unquote(path).lstrip('/')).resolve()
+        if page.is_dir():
+            page = page / 'index.html'
+        if self.pages not in page.parents or not page.is_file():
+            return None
+        return page
+
+# ============================================================================
+# THROTTLING
+# ============================================================================
+
+class Throttle:
+    """Sliding one-second window: more than `rps` requests in it get a 429."""
+
+    def __init__(self, rps: Optional[float]):
+        self.rps = rps
+        self._recent = []
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if not self.rps:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._recent = [t for t in self._recent if now - t < 1.0]
+            if len(self._recent) >= self.rps:
+                return False
+            self._recent.append(now)
+            return True
+
+# ============================================================================
+# REQUEST HANDLER
+# ============================================================================
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real thing
+    server_version = 'StandIn/1.0'
+
+    def log_message(self, format, *args):
+        pass  # Benchmarks don't need a log line per request
+
+    def _empty(self, status: int, headers: Optional[dict] = None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _serve(self, head: bool):
+        config = self.server.config
+        self.server.count_request()
+
+        delay = config.latency + random.uniform(0, config.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if not self.server.throttle.allow():
+            self._empty(429, {'Retry-After': str(config.retry_after)})
+            return
+        if random.random() < config.error_rate:
+            self._empty(500)
+            return
+
+        path = self.path.split('?', 1)[0]
+        page = config.page_for(path)
+        if page is not None:
+            self._serve_page(page, head)
+            return
+
+        body = config.body_for(path)
+        if body is None:
+            self._empty(404)
+            return
+        if random.random() < config.bad_rate:
+            # The classic: an error page with a cheerful 200
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(MAINTENANCE_PAGE)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(MAINTENANCE_PAGE)
+            return
+
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        validators = {'ETag': etag, 'Last-Modified': LAST_MODIFIED}
+        if self.headers.get('If-None-Match') == etag:
+            self._empty(304, validators)
+            return
+
+        status, start = 200, 0
+        range_header = self.headers.get('Range', '')
+        if_range = self.headers.get('If-Range')
+        if range_header.startswith('bytes=') and if_range in (None, etag, LAST_MODIFIED):
+            try:
+                start = int(range_header[len('bytes='):].split('-', 1)[0])
+            except ValueError:
+                start = 0
+            if start >= len(body):
+                self._empty(416, {'Content-Range': f'bytes */{len(body)}'})
+                return
+            status = 206
+
+        payload = body[start:]
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in validators.items():
+            self.send_header(key, value)
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{len(body) - 1}/{len(body)}')
+        self.end_headers()
+        if head:
+            return
+
+        if random.random() < config.drop_rate:
+            # Send a third of it, then hang up
+            self.wfile.write(payload[:len(payload) // 3])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.server.count_bytes(len(payload))
+        self.wfile.write(payload)
+
+    def _serve_page(self, page: Path, head: bool):
+        body = page.read_bytes()
+        mtime = int(page.stat().st_mtime)
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        validators = {'ETag': etag, 'Last-Modified': formatdate(mtime, usegmt=True)}
+        if_none_match = self.headers.get('If-None-Match')
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_none_match is not None:
+            unchanged = if_none_match == etag
+        else:
+            try:
+                unchanged = if_modified_since is not None and parsedate_to_datetime(if_modified_since).timestamp() >= mtime
+            except (TypeError, ValueError):
+                unchanged = False
+        if unchanged:
+            self._empty(304, validators)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in validators.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded stand-in server that also counts what it served."""
+
+    daemon_threads = True
+
+    def __init__(self, address, config: ServerConfig):
+        super().__init__(address, StandInHandler)
+        self.config = config
+        self.throttle = Throttle(config.throttle_rps)
+        self.requests_served = 0
+        self.bytes_served = 0
+        self._counter_lock = threading.Lock()
+
+    def count_request(self):
+        with self._counter_lock:
+            self.requests_served += 1
+
+    def count_bytes(self, size: int):
+        with self._counter_lock:
+            self.bytes_served += size
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/{{year}}/{{year}}_{{ensemble}}_Concert.pdf"
+
+def start_server(config: ServerConfig, host: str = '127.0.0.1', port: int = 0) -> StandInServer:
+    """Start a stand-in server on a background thread (port 0 = pick a free one)."""
+    server = StandInServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """The stand-in knobs, shared with the benchmark harness."""
+    parser.add_argument('--hit-ratio', type=float, default=0.1, help='Fraction of paths that exist (default: 0.1)')
+    parser.add_argument('--median-size', type=int, default=512 * 1024, help='Median PDF size in bytes (default: 524288)')
+    parser.add_argument('--size-sigma', type=float, default=0.8, help='Log-normal spread of PDF sizes (default: 0.8)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds before each response (default: 0.05)')
+    parser.add_argument('--latency-jitter', type=float, default=0.02, help='Extra random latency, seconds (default: 0.02)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500 (default: 0)')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Fraction of bodies cut off mid-transfer (default: 0)')
+    parser.add_argument('--bad-rate', type=float, default=0.0,
+                        help='Fraction of hits answered with a 200 HTML maintenance page (default: 0)')
+    parser.add_argument('--throttle-rps', type=float, help='Requests/second above which we answer 429 (default: unlimited)')
+    parser.add_argument('--seed', type=int, default=0, help='Changes which paths exist and how big they are')
+    parser.add_argument('--pages', help='Also serve the saved HTML listing pages in this directory (for --discover)')
+
+def config_from_args(args: argparse.Namespace) -> ServerConfig:
+    return ServerConfig(hit_ratio=args.hit_ratio, median_size=args.median_size, size_sigma=args.size_sigma,
+                        latency=args.latency, latency_jitter=args.latency_jitter, error_rate=args.error_rate,
+                        drop_rate=args.drop_rate, bad_rate=args.bad_rate, throttle_rps=args.throttle_rps,
+                        seed=args.seed, pages=args.pages)
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Midwest Clinic PDF archive')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on, 0 for any (default: 8765)')
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandInServer((args.host, args.port), config_from_args(args))
+    print(server.base_url, flush=True)
+    if server.config.pages is not None:
+        host, port = server.server_address[:2]
+        print(f"Listing pages: http://{host}:{port}/ (try scraper.py --discover FILE --archive-url ...)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nServed {server.requests_served} requests, {server.bytes_served} body bytes", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
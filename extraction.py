@@ -0,0 +1,209 @@
+"""
+PROGRAM TEXT EXTRACTION
+Pulls the text out of downloaded concert programs and picks out the
+repertoire (title, composer, arranger), one JSON line per program.
+
+Extraction is CPU-bound, so it runs on a process pool that the scraper feeds
+as each PDF lands: the network and the cores stay busy at the same time.
+
+Needs the optional pypdf package:
+    pip install pypdf
+"""
+
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    import pypdf
+except ImportError:  # Optional - only --extract needs it
+    pypdf = None
+
+# ============================================================================
+# REPERTOIRE PARSING
+# ============================================================================
+
+# "Title ........ Composer", "Title<tab>Composer" or "Title    Composer"
+_LEADER = re.compile(r"\s*(?:\.{3,}|…+|\t+|\s{2,})\s*")
+_ARRANGER = re.compile(r"\s*,?\s*\b(?:arr(?:anged)?|trans(?:cribed)?|orch(?:estrated)?)\.?(?:\s+by)?\s+", re.IGNORECASE)
+_LIFESPAN = re.compile(r"\s*\((?:b\.\s*)?\d{4}(?:\s*[-–]\s*\d{4})?\)")
+_NAME = re.compile(r"^[A-Z][\w'’.\-]*(?:\s+(?:[A-Z][\w'’.\-]*|van|von|de|del|der|da|di|du|la|le))*$")
+MAX_NAME_WORDS = 5
+
+def _clean_name(text: str) -> str:
+    return _LIFESPAN.sub('', text).strip(' ,/')
+
+def parse_repertoire(text: str, page: int) -> List[dict]:
+    """
+    Best-effort repertoire lines from one page of program text.
+
+    Programs usually set each piece as a title and a credit separated by dot
+    leaders, a tab or a wide gap, e.g. "Festive Overture ....... Dmitri
+    Shostakovich / arr. Donald Hunsberger (1906-1975)". Lines that don't
+    look like that are ignored.
+    """
+    pieces = []
+    for line in text.splitlines():
+        parts = [part for part in _LEADER.split(line.strip()) if part]
+        if len(parts) != 2:
+            continue
+        title, credit = parts
+
+        arranger = None
+        match = _ARRANGER.search(credit)
+        if match:
+            credit, arranger = credit[:match.start()], _clean_name(credit[match.end():])
+        composer = _clean_name(credit)
+
+        names = [name for name in (composer, arranger) if name]
+        if not names or any(not _NAME.match(name) or len(name.split()) > MAX_NAME_WORDS for name in names):
+            continue
+        pieces.append({'title': title.strip(' "“”'), 'composer': composer or None,
+                       'arranger': arranger or None, 'page': page})
+    return pieces
+
+def extract_program(path: str, year: int, ensemble: str, sha256: str) -> dict:
+    """
+    Extract one program (runs in a pool worker).
+
+    Returns:
+        The dataset record: year, ensemble, path, sha256, page texts and
+        pieces - or the same keys plus 'error' if the PDF couldn't be read
+    """
+    record = {'year': year, 'ensemble': ensemble, 'path': path, 'sha256': sha256}
+    logging.getLogger('pypdf').setLevel(logging.CRITICAL)  # We report unreadable files ourselves
+    try:
+        reader = pypdf.PdfReader(path)
+        pages = [page.extract_text() or '' for page in reader.pages]
+    except Exception as e:  # Broken PDFs come in every shape imaginable
+        record['error'] = f"{type(e).__name__}: {e}"
+        return record
+    record['pages'] = pages
+    record['pieces'] = [piece for number, text in enumerate(pages, 1) for piece in parse_repertoire(text, number)]
+    return record
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def load_processed(dataset: Path) -> set:
+    """Every (year, ensemble, sha256) already in a JSONL dataset."""
+    processed = set()
+    try:
+        with open(dataset, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A half-written last line from an interrupted run
+                processed.add((record['year'], record['ensemble'], record['sha256']))
+    except FileNotFoundError:
+        pass
+    return processed
+
+class ExtractionPipeline:
+    """
+    Hands finished PDFs to a process pool and appends each result to a JSONL
+    dataset as soon as it's ready.
+
+    submit() returns straight away while the pool has room, and blocks once
+    `backlog` programs are waiting - so a fast download run can't pile up an
+    unbounded queue behind slow extraction. Programs whose exact bytes are
+    already in the dataset are skipped. Safe to call from multiple workers.
+    """
+
+    def __init__(self, dataset: Path, workers: Optional[int] = None, backlog: Optional[int] = None):
+        self.dataset = Path(dataset)
+        self.workers = workers or os.cpu_count() or 1
+        self.extracted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.pieces = 0
+        self._processed = load_processed(self.dataset)
+        self._pending = set()
+        self._slots = threading.BoundedSemaphore(backlog or self.workers * 2)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._out = None
+
+    def submit(self, year: int, ensemble: str, path: Path, sha256: str) -> bool:
+        """
+        Queue one program for extraction; False if it's already done (or
+        queued), or if the pool has broken. Never raises for a pool problem -
+        a download shouldn't fail because extraction did.
+        """
+        key = (year, ensemble, sha256)
+        with self._lock:
+            if key in self._processed or key in self._pending:
+                self.skipped += 1
+                return False
+            self._pending.add(key)
+            if self._pool is None:
+                # spawn, not fork: we're called from a process full of threads
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+
+        self._slots.acquire()  # Backpressure: wait here if the pool is behind
+        try:
+            future = self._pool.submit(extract_program, str(path), year, ensemble, sha256)
+        except Exception:  # BrokenProcessPool, or we're shutting down
+            self._slots.release()
+            with self._lock:
+                self._pending.discard(key)
+                self.failed += 1
+            return False
+        future.add_done_callback(functools.partial(self._finish, key))
+        return True
+
+    def _finish(self, key: Tuple[int, str, str], future):
+        try:
+            try:
+                record = future.result()
+            except Exception as e:  # A worker died (BrokenProcessPool and friends)
+                record = {'error': str(e)}
+            with self._lock:
+                self._pending.discard(key)
+                if 'error' in record:
+                    self.failed += 1
+                    return
+                if self._out is None:
+                    self.dataset.parent.mkdir(parents=True, exist_ok=True)
+                    self._out = open(self.dataset, 'a', encoding='utf-8')
+                self._out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                self._out.flush()
+                self._processed.add(key)
+                self.extracted += 1
+                self.pieces += len(record['pieces'])
+        finally:
+            self._slots.release()
+
+    def summary(self) -> str:
+        text = f"📝 Extracted {self.extracted} programs ({self.pieces} pieces) into {self.dataset}"
+        if self.skipped:
+            text += f", {self.skipped} already done"
+        if self.failed:
+            text += f", {self.failed} unreadable"
+        return text
+
+    def close(self):
+        """Wait for everything queued to be extracted and written."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        with self._lock:
+            if self._out is not None:
+                self._out.close()
+                self._out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -12,30 +12,105 @@ Usage:
     python scraper.py --list ensemble_lists/known_ensembles.txt --years 2010-2023
     python scraper.py --year 2019 --ensemble NorthTexas --boring  # (why tho?)
     python scraper.py --year 2019 --ensemble USAF --chaos  # LET'S GOOOO!!!
+    python scraper.py --list ensemble_lists/known_ensembles.txt --years 2000-2023 --workers 4
 """
 
 import argparse
+import codecs
+import csv
+import functools
+import hashlib
+import heapq
+import json
 import os
+import queue
+import re
+import signal
+import socket
+import socketserver
+import sqlite3
 import sys
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
-from typing import List, Tuple, Optional
-from urllib.parse import quote
+from collections import Counter, defaultdict, deque
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Tuple, Optional
+from urllib.parse import quote, unquote, urldefrag, urljoin, urlsplit
 import random
 
+try:
+    import fcntl
+except ImportError:  # Windows - saves still merge, just without a lock against other processes
+    fcntl = None
+
 # Import our BEAUTIFUL reaction system
 sys.path.insert(0, str(Path(__file__).parent))
 from ascii_art import reactions
+import extraction
+import search_index
 
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
 
 BASE_URL = "https://www.midwestclinic.org/user_files_1/pdfs/concerts/{year}/{year}_{ensemble}_Concert.pdf"
+ARCHIVE_URL = "https://www.midwestclinic.org/clinic-archive/"  # where --discover starts crawling
 RATE_LIMIT_DELAY = 1.0  # seconds - we're CIVILIZED
+ADAPTIVE_MIN_RATE = 0.2  # requests/second - never slower than this when adapting
+ADAPTIVE_MAX_RATE = 5.0  # requests/second - never faster than this when adapting
+TARGET_LATENCY = 2.0  # seconds to first byte - slower than this means "ease off"
+BANDWIDTH_BURST = 0.1  # seconds of --max-bandwidth a transfer may run ahead after a quiet spell
+BANDWIDTH_TURN = 0.05  # seconds of --max-bandwidth per throttled read, so transfers take short turns
+MAX_RETRY_AFTER = 600  # seconds - we'll honour Retry-After, within reason
+MAX_ATTEMPTS = 3  # tries per job before it counts as a failure
+RETRY_BACKOFF = 1.0  # seconds - first retry delay, doubling after that (plus jitter)
+MAX_RETRY_BACKOFF = 30.0  # seconds - retry delays never get longer than this
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+BREAKER_THRESHOLD = 5  # consecutive connection failures before we stop and wait
+BREAKER_COOLDOWN = 30.0  # seconds to wait before probing a server that looked down
 TIMEOUT = 30  # seconds
+PDF_MAGIC = b"%PDF-"  # every PDF starts with this...
+PDF_EOF = b"%%EOF"  # ...and ends with this
+PDF_SNIFF_BYTES = 1024  # how far into the head (and tail) of a body the markers may sit
+PDF_CONTENT_TYPES = ('application/pdf', 'application/x-pdf', 'application/octet-stream', 'binary/octet-stream')
 OUTPUT_DIR = "programs"
+DEFAULT_WORKERS = 1  # serial, like the good old days
+HOST_POOLS = 4  # hosts whose keep-alive pools are kept at once (the archive, the PDFs, a CDN --discover found...)
+CHUNK_SIZE = 64 * 1024  # bytes per streamed read - memory is per chunk, not per PDF
+NEGATIVE_CACHE_FILE = ".negative_cache.json"  # lives in OUTPUT_DIR
+RECENT_MISS_TTL = 24 * 3600  # seconds - this year's programs may still show up
+SETTLED_YEAR_AGE = 2  # years at least this old are done; their 404s never expire
+MANIFEST_FILE = "manifest.sqlite3"  # lives in OUTPUT_DIR
+RESOLVED_NAMES_FILE = ".resolved_names.json"  # lives in OUTPUT_DIR; written by --resolve
+ALIASES_FILE = "ensemble_lists/aliases.txt"  # other names an ensemble has been published under
+MAX_NAME_VARIANTS = 12  # spellings --resolve tries per program before calling it missing
+PRIOR_HIT_RATE = 0.1  # what the scheduler assumes about an ensemble or year it knows nothing about...
+PRIOR_WEIGHT = 2.0  # ...and how many jobs' worth of evidence that assumption counts for
+ADJACENCY_BOOST = 1.0  # a hit one year away doubles a job's score, two years away x1.5, ...
+SCHEDULER_WINDOW = 5000  # jobs the scheduler weighs at once; a bigger grid is pulled in as jobs go out
+LEASE_SECONDS = 300  # how long a --queue worker owns a job without renewing before others may take it
+MAX_LEASES = 3  # a job whose lease expires this many times (it keeps killing workers?) is given up on
+JOURNAL_FILE = "journal.jsonl"  # lives in OUTPUT_DIR; what the last batch run got through, for --resume
+JOURNAL_SYNC_EVERY = 32  # finished jobs between journal fsyncs...
+JOURNAL_SYNC_SECONDS = 2.0  # ...or seconds, whichever comes first
+EVENT_FLUSH_SECONDS = 1.0  # --output jsonl hands buffered events to the reader at least this often
+LISTING_CACHE_DIR = ".listing_cache"  # lives in OUTPUT_DIR; archive pages --discover fetched, for revalidation
+DISCOVERED_LINKS_FILE = ".discovered_links.json"  # lives in OUTPUT_DIR; the real URLs --discover found
+MAX_DISCOVERY_PAGES = 200  # listing pages --discover fetches before it stops following links
+REPERTOIRE_FILE = "repertoire.jsonl"  # lives in OUTPUT_DIR; written by --extract
+SEARCH_INDEX_DIR = "search_index"  # lives in OUTPUT_DIR; kept up to date by --index
+BLOB_DIR = ".blobs"  # lives in OUTPUT_DIR; exists once --dedupe has been run
+DAEMON_SOCKET = ".scraper.sock"  # lives in OUTPUT_DIR; scraper_client.py looks here too
+USER_AGENT = "MidwestClinicScraper3000/1.0 (concert program archiver; polite, rate limited)"
 
 # Colors for terminal (with fallback for boring mode)
 class Colors:
@@ -53,323 +128,4109 @@ class Colors:
 # ============================================================================
 
 class Stats:
+    """Counts outcomes. Safe to update from multiple worker threads."""
+
     def __init__(self):
         self.success = 0
         self.skipped = 0
         self.failed = 0
+        self.cached_misses = 0
+        self.retries = 0
+        self.invalid = 0
+        self.resolved = 0
+        self.deferred = 0
         self.total = 0
+        self._lock = threading.Lock()
 
     def add_success(self):
-        self.success += 1
+        with self._lock:
+            self.success += 1
 
-    def add_skip(self):
-        self.skipped += 1
+    def add_skip(self, count: int = 1):
+        with self._lock:
+            self.skipped += count
 
     def add_failure(self):
-        self.failed += 1
+        with self._lock:
+            self.failed += 1
+
+    def add_cached_miss(self):
+        with self._lock:
+            self.cached_misses += 1
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def add_invalid(self):
+        with self._lock:
+            self.invalid += 1
+
+    def add_resolved(self):
+        with self._lock:
+            self.resolved += 1
+
+    def add_deferred(self, count: int = 1):
+        with self._lock:
+            self.deferred += count
+
+    def merge(self, counts: dict):
+        """Add another tracker's counters (from to_dict(); 'total' is left alone)."""
+        with self._lock:
+            for name, count in counts.items():
+                if name != 'total':
+                    setattr(self, name, getattr(self, name) + count)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {'success': self.success, 'skipped': self.skipped, 'failed': self.failed,
+                    'cached_misses': self.cached_misses, 'retries': self.retries, 'invalid': self.invalid,
+                    'resolved': self.resolved, 'deferred': self.deferred, 'total': self.total}
 
 # ============================================================================
-# THE UNHINGED UI ENGINE
+# METRICS
 # ============================================================================
 
-class ScraperUI:
-    """Handles all the PERSONALITY"""
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(10))  # 1 KB .. 256 MB
+JOB_PHASES = ('rate_limit_wait', 'connect', 'ttfb', 'transfer', 'bandwidth_wait', 'disk_write', 'total')
+METRICS_PREFIX = "midwest_scraper"
 
-    def __init__(self, boring: bool = False, chaos: bool = False):
-        self.boring = boring
-        self.chaos = chaos
-        self.colors_enabled = not boring
+class JobTiming:
+    """
+    Where one job's time went. Requests add to it (a retried job accumulates
+    every attempt), so each field is the job's total for that phase:
 
-    def _colorize(self, text: str, color: str) -> str:
-        """Add color if not in boring mode."""
-        if self.boring:
-            return text
-        return f"{color}{text}{Colors.RESET}"
+        rate_limit_wait  waiting on the limiter/circuit breaker
+        connect          TCP + TLS setup (0 when a pooled connection was reused)
+        ttfb             request sent -> response headers, minus connect
+        transfer         reading the body off the network
+        bandwidth_wait   holding off reading to stay under --max-bandwidth
+        disk_write       writing, fsyncing and renaming the file
+    """
 
-    def print_startup(self):
-        """Show the startup banner."""
-        if self.boring:
-            print(reactions.BORING_STARTUP)
-            print(self._colorize(random.choice(reactions.BORING_COMPLAINT), Colors.YELLOW))
-        else:
-            startup = reactions.get_random_startup(chaos=self.chaos)
-            print(self._colorize(startup, Colors.CYAN + Colors.BOLD))
+    def __init__(self):
+        self.rate_limit_wait = 0.0
+        self.connect = 0.0
+        self.ttfb = 0.0
+        self.transfer = 0.0
+        self.bandwidth_wait = 0.0
+        self.disk_write = 0.0
+        self.total = 0.0
+        self.bytes = 0
+        self.requests = 0
+        self.url = None  # the program URL asked for last (after any --resolve)
+        self.status = None  # last HTTP status seen, None if the last request failed
+        self.invalid = False  # the body turned out not to be a (whole) PDF
+        self.cached_miss = False  # a known 404, so nothing was asked
 
-    def print_success(self, filename: str, ensemble: str = ""):
-        """Show success message."""
-        if self.boring:
-            print(f"✓ Downloaded: {filename}")
-        else:
-            message = reactions.get_success_message(ensemble, chaos=self.chaos)
-            print(f"{self._colorize('✓', Colors.GREEN)} {self._colorize(filename, Colors.BOLD)}")
-            print(f"   └─ {self._colorize(message, Colors.GREEN)}")
+    def outcome(self, ok: bool) -> str:
+        """Classify the job for metrics labels."""
+        if ok:
+            return 'downloaded'
+        if self.invalid:
+            return 'invalid_pdf'
+        if self.cached_miss:
+            return 'cached_miss'
+        if self.requests == 0:
+            return 'skipped'
+        if self.status is None:
+            return 'network_error'
+        return {304: 'not_modified', 404: 'not_found'}.get(self.status, 'http_error')
 
-    def print_duplicate(self, filename: str):
-        """Show duplicate/skip message."""
-        if self.boring:
-            print(f"⊘ Already exists: {filename}")
-        else:
-            message = reactions.get_duplicate_message(chaos=self.chaos)
-            print(f"{self._colorize('⊘', Colors.YELLOW)} {self._colorize(filename, Colors.BOLD)}")
-            print(f"   └─ {self._colorize(message, Colors.YELLOW)}")
+class Histogram:
+    """Prometheus-style cumulative histogram (not thread-safe on its own)."""
 
-    def print_failure(self, filename: str, error_type: str = "404", status_code: Optional[int] = None):
-        """Show failure message."""
-        if self.boring:
-            status_msg = f"({status_code})" if status_code else f"({error_type})"
-            print(f"✗ Failed {status_msg}: {filename}")
-        else:
-            if error_type == "404" or (status_code and status_code == 404):
-                message = reactions.get_404_message(chaos=self.chaos)
-            else:
-                message = reactions.get_connection_error_message(chaos=self.chaos)
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
 
-            status_msg = f"{status_code}" if status_code else error_type
-            print(f"{self._colorize('✗', Colors.RED)} {self._colorize(f'Failed ({status_msg})', Colors.RED)}: {filename}")
-            print(f"   └─ {self._colorize(message, Colors.RED)}")
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
 
-    def print_rate_limit(self):
-        """Show rate limiting message with optional rant."""
-        if self.boring:
-            print("⏳ Rate limiting...")
-            return
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """[(le, cumulative count)] including '+Inf'."""
+        running, rows = 0, []
+        for bound, count in zip(self.buckets + (None,), self.counts):
+            running += count
+            rows.append(('+Inf' if bound is None else f"{bound:g}", running))
+        return rows
 
-        message = reactions.get_rate_limit_message()
-        print(f"{self._colorize('⏳', Colors.CYAN)} {message}")
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating inside its bucket (like histogram_quantile)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        running, lower = 0, 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and running + count >= target:
+                return round(lower + (bound - lower) * (target - running) / count, 6)
+            running += count
+            lower = bound
+        return self.buckets[-1]  # In the +Inf bucket - the best we can say
 
-        # Sometimes add a rant (50% chance)
-        if random.random() < 0.5 and not self.chaos:
-            rant = reactions.get_rate_limit_rant()
-            for line in rant:
-                time.sleep(0.25)  # Dramatic pausing
-                print(f"   {self._colorize(line, Colors.CYAN)}")
+class Metrics:
+    """
+    Aggregates JobTimings into per-phase histograms, outcome counters and
+    byte totals, and exports them as JSON or Prometheus text exposition
+    (for node_exporter's textfile collector). Safe to share across workers.
+    """
 
-    def print_progress(self, current: int, total: int, year: str, ensemble: str):
-        """Show progress with occasional commentary."""
-        progress_text = f"[{current}/{total}] Processing {year} - {ensemble}"
+    def __init__(self):
+        self.phases = {phase: Histogram(TIME_BUCKETS) for phase in JOB_PHASES}
+        self.job_bytes = Histogram(SIZE_BUCKETS)
+        self.outcomes = {}
+        self.bytes = 0
+        self.requests = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
 
-        if self.boring:
-            print(f"\n{progress_text}")
-            return
+    def observe_job(self, timing: JobTiming, ok: bool):
+        with self._lock:
+            for phase in JOB_PHASES:
+                self.phases[phase].observe(getattr(timing, phase))
+            outcome = timing.outcome(ok)
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            if timing.bytes:
+                self.job_bytes.observe(timing.bytes)
+            self.bytes += timing.bytes
+            self.requests += timing.requests
 
-        print(f"\n{self._colorize(progress_text, Colors.BLUE + Colors.BOLD)}")
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'started': self.started,
+                'duration_seconds': time.time() - self.started,
+                'jobs': dict(self.outcomes),
+                'requests': self.requests,
+                'bytes_downloaded': self.bytes,
+                'phases': {
+                    phase: {
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'p50': histogram.quantile(0.5),
+                        'p90': histogram.quantile(0.9),
+                        'p99': histogram.quantile(0.99),
+                        'buckets': dict(histogram.cumulative()),
+                    }
+                    for phase, histogram in self.phases.items()
+                },
+                'downloaded_file_bytes': {
+                    'count': self.job_bytes.count,
+                    'sum': self.job_bytes.sum,
+                    'buckets': dict(self.job_bytes.cumulative()),
+                },
+            }
 
-        # Check for ensemble easter eggs
-        easter_egg = reactions.get_ensemble_easter_egg(ensemble)
-        if easter_egg:
-            print(f"├─ {self._colorize(easter_egg, Colors.MAGENTA)}")
+    def to_prometheus(self) -> str:
+        data = self.to_dict()
+        p = METRICS_PREFIX
+        lines = [
+            f"# HELP {p}_job_phase_seconds Time spent per job in each phase.",
+            f"# TYPE {p}_job_phase_seconds histogram",
+        ]
+        for phase, values in data['phases'].items():
+            for le, count in values['buckets'].items():
+                lines.append(f'{p}_job_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {count}')
+            lines.append(f'{p}_job_phase_seconds_sum{{phase="{phase}"}} {values["sum"]:.6f}')
+            lines.append(f'{p}_job_phase_seconds_count{{phase="{phase}"}} {values["count"]}')
 
-        # Random mid-batch commentary
-        if reactions.should_show_mid_batch_comment():
-            comment = reactions.get_mid_batch_comment()
-            print(f"└─ {self._colorize(comment, Colors.CYAN)}")
+        lines += [f"# HELP {p}_downloaded_file_bytes Size of each downloaded file.",
+                  f"# TYPE {p}_downloaded_file_bytes histogram"]
+        sizes = data['downloaded_file_bytes']
+        for le, count in sizes['buckets'].items():
+            lines.append(f'{p}_downloaded_file_bytes_bucket{{le="{le}"}} {count}')
+        lines.append(f"{p}_downloaded_file_bytes_sum {sizes['sum']:.0f}")
+        lines.append(f"{p}_downloaded_file_bytes_count {sizes['count']}")
 
-    def print_summary(self, stats: Stats):
-        """Show the final summary with ASCII art glory."""
-        if self.boring:
-            print("\n" + "="*50)
-            print("SUMMARY")
-            print("="*50)
-            print(f"Successfully Downloaded: {stats.success}")
-            print(f"Already Existed: {stats.skipped}")
-            print(f"Failed: {stats.failed}")
-            print(f"Output Directory: /{OUTPUT_DIR}/")
-            print("="*50)
-            return
+        lines += [f"# HELP {p}_jobs_total Jobs by outcome.", f"# TYPE {p}_jobs_total counter"]
+        for outcome, count in sorted(data['jobs'].items()):
+            lines.append(f'{p}_jobs_total{{outcome="{outcome}"}} {count}')
+        lines += [
+            f"# HELP {p}_requests_total HTTP requests sent.", f"# TYPE {p}_requests_total counter",
+            f"{p}_requests_total {data['requests']}",
+            f"# HELP {p}_bytes_downloaded_total Body bytes written to disk.",
+            f"# TYPE {p}_bytes_downloaded_total counter",
+            f"{p}_bytes_downloaded_total {data['bytes_downloaded']}",
+            f"# HELP {p}_run_duration_seconds Wall time of the last run.",
+            f"# TYPE {p}_run_duration_seconds gauge",
+            f"{p}_run_duration_seconds {data['duration_seconds']:.3f}",
+            f"# HELP {p}_last_run_timestamp_seconds When the last run finished.",
+            f"# TYPE {p}_last_run_timestamp_seconds gauge",
+            f"{p}_last_run_timestamp_seconds {time.time():.0f}",
+        ]
+        return '\n'.join(lines) + '\n'
 
-        # THE GLORIOUS SUMMARY
-        header = reactions.get_summary_header()
-        footer = reactions.get_summary_footer()
-        outro = reactions.get_summary_outro()
+    def write(self, path: Path, fmt: str):
+        """Write metrics atomically, so the textfile collector never reads half a file."""
+        path = Path(path)
+        if path.parent != Path('.'):
+            path.parent.mkdir(parents=True, exist_ok=True)
+        content = json.dumps(self.to_dict(), indent=2) if fmt == 'json' else self.to_prometheus()
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
 
-        print("\n")
-        print(self._colorize("╔═════════════════════════════════════════════════╗", Colors.BOLD))
-        print(self._colorize(f"║   {header:^44} ║", Colors.BOLD))
-        print(self._colorize("╠═════════════════════════════════════════════════╣", Colors.BOLD))
-        print(f"║  {self._colorize('✓', Colors.GREEN)} {self._colorize(f'Successfully Yoinked: {stats.success}', Colors.GREEN):54} ║")
-        print(f"║  {self._colorize('⊘', Colors.YELLOW)} {self._colorize(f'Already Had (boring): {stats.skipped}', Colors.YELLOW):54} ║")
-        print(f"║  {self._colorize('✗', Colors.RED)} {self._colorize(f'Failures (welp): {stats.failed}', Colors.RED):54} ║")
-        print("║                                                 ║")
-        print(f"║  🎷 {self._colorize(f'YOUR HOARD: /{OUTPUT_DIR}/', Colors.CYAN):46} ║")
-        print("║                                                 ║")
-        print(f"║  {self._colorize(footer, Colors.MAGENTA):50} ║")
-        print(self._colorize("╚═════════════════════════════════════════════════╝", Colors.BOLD))
-        print(f"\n{self._colorize(outro, Colors.CYAN)}")
+class TokenBucket:
+    """
+    A token bucket shared by every worker, so the whole run stays within
+    `rate` requests per second no matter how many threads are downloading.
 
-        # Chaos mode gets EXTRA celebration
-        if self.chaos and stats.success > 0:
-            print(self._colorize("\n🎉🎊🎉 CHAOS REIGNS SUPREME!!! 🎉🎊🎉", Colors.MAGENTA + Colors.BOLD))
-            print(self._colorize("WE'RE UNSTOPPABLE!!! NOTHING CAN STOP THE PDF HOARD!!!", Colors.MAGENTA))
+    Each request takes one token. When the bucket is empty the caller reserves
+    the next token and sleeps until it would have refilled, which keeps callers
+    roughly first-come-first-served.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, blocking until it is available. Returns seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            delay = max(delay, self._paused_until - now)
+
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
+
+    def set_rate(self, rate: float):
+        """Change the refill rate from now on."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def pause(self, seconds: float):
+        """Hold every acquire() for `seconds` (the server asked us to, via Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def observe(self, status: Optional[int], latency: float, retry_after: Optional[float] = None):
+        """
+        Hear how a request went. A fixed bucket only cares about Retry-After;
+        AdaptiveRateLimiter also steers its rate by it.
+
+        Args:
+            status: HTTP status, or None if the request timed out / failed
+            latency: Seconds until the response headers arrived
+            retry_after: Seconds the server asked us to wait, if it did
+        """
+        if retry_after:
+            self.pause(retry_after)
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    A token bucket whose rate follows the server's mood (AIMD, like TCP):
+
+    - every healthy response (fast, no 429/503) adds `increase` requests/second
+    - a 429, 503, timeout or slow response multiplies the rate by `decrease`
+    - the rate always stays between `min_rate` and `max_rate`
+
+    Responses that were already in flight when we backed off would otherwise
+    knock the rate down again one after another, so decreases are spaced at
+    least `cooldown` seconds apart.
+    """
+
+    def __init__(self, rate: float, min_rate: float = ADAPTIVE_MIN_RATE, max_rate: float = ADAPTIVE_MAX_RATE,
+                 target_latency: float = TARGET_LATENCY, increase: float = 0.05, decrease: float = 0.5,
+                 cooldown: float = 2.0, capacity: float = 1.0):
+        if not 0 < min_rate <= max_rate:
+            raise ValueError("need 0 < min_rate <= max_rate")
+        super().__init__(min(max(rate, min_rate), max_rate), capacity=capacity)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._last_decrease = 0.0
+
+    def observe(self, status: Optional[int], latency: float, retry_after: Optional[float] = None):
+        super().observe(status, latency, retry_after)
+
+        congested = status is None or status in (429, 503) or latency > self.target_latency
+        with self._lock:
+            now = time.monotonic()
+            if congested:
+                if now - self._last_decrease < self.cooldown:
+                    return
+                self._last_decrease = now
+                new_rate = max(self.min_rate, self.rate * self.decrease)
+            else:
+                new_rate = min(self.max_rate, self.rate + self.increase)
+            self._refill(now)
+            self.rate = new_rate
+
+class BandwidthLimiter:
+    """
+    Caps the bytes per second read across every transfer in flight, and
+    shares them fairly.
+
+    Each read books the next slot on one shared timeline (the GCRA form of a
+    token bucket), so concurrent transfers take turns in the order they ask,
+    chunk by chunk: one big PDF can't starve the rest, and a transfer the
+    server feeds slowly leaves its share to the others. Reads are booked
+    after they happen - a transfer over its share just stops reading for a
+    moment, and TCP flow control slows the sender down to match.
+
+    Independent of the request-rate TokenBucket. Safe to share across workers.
+    """
+
+    def __init__(self, rate: float, burst: float = BANDWIDTH_BURST, turn: float = BANDWIDTH_TURN):
+        self.rate = rate  # bytes per second
+        self.burst = burst
+        self.turn = turn
+        self._booked_until = 0.0  # when the bandwidth booked so far is used up
+        self._lock = threading.Lock()
+
+    def read_size(self, chunk_size: int) -> int:
+        """How much to read at a time: short turns interleave transfers finely."""
+        return max(1024, min(chunk_size, int(self.rate * self.turn)))
+
+    def consume(self, size: int) -> float:
+        """Book `size` bytes just read, sleeping until they fit under the cap. Returns the seconds slept."""
+        with self._lock:
+            now = time.monotonic()
+            self._booked_until = max(self._booked_until, now) + size / self.rate
+            delay = self._booked_until - now - self.burst
+        if delay <= 0:
+            return 0.0
+        time.sleep(delay)
+        return delay
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), capped."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
 
 # ============================================================================
-# CORE SCRAPER FUNCTIONS
+# RETRIES AND CIRCUIT BREAKER
 # ============================================================================
 
-def download_program(year: int, ensemble: str, ui: ScraperUI, stats: Stats) -> bool:
+class RetryPolicy:
     """
-    Download a single concert program PDF.
+    When and how long to wait before trying a job again.
 
-    Args:
-        year: The year (e.g., 2009)
-        ensemble: The ensemble name (e.g., "Buchholz" or "USAF")
-        ui: The UI handler
-        stats: Statistics tracker
+    Timeouts, dropped connections and `retryable_statuses` are retried up to
+    `max_attempts` tries in total. Delays double from `backoff` up to
+    `max_backoff`, and half of each delay is random so a crowd of workers
+    that failed together doesn't come back together.
+    """
 
-    Returns:
-        True if successful, False otherwise
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS, backoff: float = RETRY_BACKOFF,
+                 max_backoff: float = MAX_RETRY_BACKOFF, retryable_statuses=RETRYABLE_STATUSES):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retryable_statuses = frozenset(retryable_statuses)
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in self.retryable_statuses
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed try number `attempt` (1-based)."""
+        cap = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+NO_RETRIES = RetryPolicy(max_attempts=1)
+
+class CircuitBreaker:
     """
-    # Create output directory
-    year_dir = Path(OUTPUT_DIR) / str(year)
-    year_dir.mkdir(parents=True, exist_ok=True)
+    Stops the whole batch from hammering a server that is clearly down.
 
-    # Build filename and URL
-    filename = f"{year}_{ensemble}_Concert.pdf"
-    filepath = year_dir / filename
-    url = BASE_URL.format(year=year, ensemble=quote(ensemble))
+    After `threshold` connection failures in a row (timeouts, refused or
+    dropped connections) the breaker opens and every request waits. Once
+    `cooldown` seconds pass, a single request is let through as a probe: if it
+    reaches the server the breaker closes and everyone resumes; if not, it
+    reopens with the cooldown doubled (up to `max_cooldown`). Only the probe
+    decides that: requests that were already in flight when the breaker
+    opened can still report back, but they don't close or reopen it.
 
-    # Check if already downloaded
-    if filepath.exists():
-        ui.print_duplicate(filename)
-        stats.add_skip()
-        return False
+    `on_open(cooldown)` / `on_close()` are called when the state flips, so the
+    UI can say what's going on.
+    """
 
-    # Download the PDF
-    try:
-        response = requests.get(url, timeout=TIMEOUT)
-
-        if response.status_code == 200:
-            # Success! Save the file
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            ui.print_success(filename, ensemble)
-            stats.add_success()
-            return True
-        elif response.status_code == 404:
-            # File not found
-            ui.print_failure(filename, error_type="404", status_code=404)
-            stats.add_failure()
-            return False
-        else:
-            # Other HTTP error
-            ui.print_failure(filename, error_type=f"HTTP {response.status_code}", status_code=response.status_code)
-            stats.add_failure()
-            return False
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN,
+                 max_cooldown: float = 600.0, on_open=None, on_close=None):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.on_open = on_open
+        self.on_close = on_close
+        self._cooldown = cooldown
+        self._failures = 0
+        self._open_until = None  # monotonic time, or None while closed
+        self._probe = None  # thread id of the request sent as the probe, if one is out
+        self._condition = threading.Condition()
 
-    except requests.exceptions.Timeout:
-        ui.print_failure(filename, error_type="TIMEOUT")
-        stats.add_failure()
-        return False
-    except requests.exceptions.ConnectionError:
-        ui.print_failure(filename, error_type="CONNECTION ERROR")
-        stats.add_failure()
-        return False
-    except Exception as e:
-        ui.print_failure(filename, error_type=f"ERROR: {str(e)}")
-        stats.add_failure()
-        return False
+    @property
+    def is_open(self) -> bool:
+        with self._condition:
+            return self._open_until is not None
 
-def load_ensemble_list(filepath: str) -> List[str]:
-    """Load ensemble names from a file (one per line)."""
-    ensembles = []
-    with open(filepath, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):  # Skip empty lines and comments
-                ensembles.append(line)
-    return ensembles
+    def before_request(self):
+        """Block while the breaker is open; the first caller after the cooldown becomes the probe."""
+        with self._condition:
+            while self._open_until is not None:
+                now = time.monotonic()
+                if self._probe is None and now >= self._open_until:
+                    self._probe = threading.get_ident()
+                    return
+                timeout = None if self._probe is not None else self._open_until - now
+                self._condition.wait(timeout)
 
-def parse_year_range(year_range: str) -> List[int]:
-    """Parse a year range like '2015-2023' into a list of years."""
-    if '-' in year_range:
-        start, end = year_range.split('-')
-        return list(range(int(start), int(end) + 1))
-    else:
-        return [int(year_range)]
+    def record(self, reached_server: bool):
+        """Report whether a request got any response at all from the server (on the thread that sent it)."""
+        opened = closed = False
+        with self._condition:
+            was_probe = self._probe == threading.get_ident()
+            if was_probe:
+                self._probe = None
+            if reached_server:
+                self._failures = 0
+                if was_probe:
+                    self._open_until = None
+                    self._cooldown = self.base_cooldown
+                    closed = True
+            else:
+                self._failures += 1
+                if was_probe:
+                    self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+                if was_probe or (self._open_until is None and self._failures >= self.threshold):
+                    self._open_until = time.monotonic() + self._cooldown
+                    opened = True
+            self._condition.notify_all()
+
+        if opened and self.on_open is not None:
+            self.on_open(self._cooldown)
+        if closed and self.on_close is not None:
+            self.on_close()
 
 # ============================================================================
-# MAIN PROGRAM
+# HTTP TRANSPORT
 # ============================================================================
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Midwest Clinic Concert Program Scraper with MAXIMUM PERSONALITY',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  %(prog)s --year 2009 --ensemble Buchholz
-  %(prog)s --years 2015-2023 --ensemble USAF
-  %(prog)s --list ensemble_lists/known_ensembles.txt --years 2010-2023
-  %(prog)s --year 2019 --ensemble NorthTexas --boring
-  %(prog)s --year 2019 --ensemble USAF --chaos
+# Connection setup time for the request in flight on this thread. urllib3
+# opens connections on the thread that needs them, so this attributes each
+# handshake to the right job.
+_connect_timing = threading.local()
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.seconds = getattr(_connect_timing, 'seconds', 0.0) + time.perf_counter() - start
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.seconds = getattr(_connect_timing, 'seconds', 0.0) + time.perf_counter() - start
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report how long connecting took."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+class Transport:
+    """
+    Everything between a job and the network: one persistent, keep-alive
+    session (so we only shake hands with midwestclinic.org once per pooled
+    connection), the shared rate and bandwidth limiters, the retry policy
+    and circuit breaker, and the read/timeout settings.
+
+    Safe to share across worker threads. Pool size should be at least the
+    number of workers, otherwise workers queue up waiting for a connection.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_WORKERS, limiter: Optional[TokenBucket] = None,
+                 timeout: float = TIMEOUT, chunk_size: int = CHUNK_SIZE, user_agent: str = USER_AGENT,
+                 retry_policy: RetryPolicy = NO_RETRIES, breaker: Optional[CircuitBreaker] = None,
+                 bandwidth: Optional[BandwidthLimiter] = None):
+        self.limiter = limiter
+        self.bandwidth = bandwidth
+        self.retry_policy = retry_policy
+        self.breaker = breaker
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.requests_sent = 0
+        self._count_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Connection': 'keep-alive',
+        })
+        # pool_block: wait for a free connection rather than opening (and then
+        # throwing away) an extra one. A pool per host, so a request to a
+        # second host doesn't evict the first one's warm connections.
+        adapter = TimedHTTPAdapter(pool_connections=HOST_POOLS, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, timing: Optional[JobTiming] = None, **kwargs) -> requests.Response:
         """
-    )
+        Issue a request through the pooled session, respecting the circuit
+        breaker and rate limit, and telling the limiter how it went (status,
+        time to headers, and any Retry-After) so it can adapt.
 
-    parser.add_argument('--year', type=int, help='Single year to download')
-    parser.add_argument('--years', type=str, help='Year range (e.g., 2015-2023)')
-    parser.add_argument('--ensemble', type=str, help='Single ensemble name')
-    parser.add_argument('--list', type=str, dest='ensemble_list', help='File with ensemble names (one per line)')
-    parser.add_argument('--boring', action='store_true', help='Disable all the fun (WHY?!)')
-    parser.add_argument('--chaos', action='store_true', help='Turn EVERYTHING up to 11')
+        If `timing` is given, the wait, connect and time-to-first-byte of this
+        request are added to it.
+        """
+        waited = time.perf_counter()
+        if self.breaker is not None:
+            self.breaker.before_request()
+        if self.limiter is not None:
+            self.limiter.acquire()
+        with self._count_lock:
+            self.requests_sent += 1
+        kwargs.setdefault('timeout', self.timeout)
+        _connect_timing.seconds = 0.0
+        start = time.perf_counter()
+        if timing is not None:
+            timing.requests += 1
+            timing.rate_limit_wait += start - waited
+            timing.status = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            self._record_timing(timing, start)
+            if self.breaker is not None:
+                self.breaker.record(reached_server=False)
+            if self.limiter is not None:
+                self.limiter.observe(None, time.perf_counter() - start)
+            raise
+        except BaseException:
+            # Not the server's fault - don't leave a breaker probe hanging
+            if self.breaker is not None:
+                self.breaker.record(reached_server=True)
+            raise
+        latency = self._record_timing(timing, start)
+        if timing is not None:
+            timing.status = response.status_code
+        if self.breaker is not None:
+            self.breaker.record(reached_server=True)
+        if self.limiter is not None:
+            retry_after = None
+            if response.status_code in (429, 503):
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self.limiter.observe(response.status_code, latency, retry_after)
+        return response
 
-    args = parser.parse_args()
+    @staticmethod
+    def _record_timing(timing: Optional[JobTiming], start: float) -> float:
+        """Split the time since `start` into connect and TTFB. Returns the total."""
+        elapsed = time.perf_counter() - start
+        if timing is not None:
+            connect = min(getattr(_connect_timing, 'seconds', 0.0), elapsed)
+            timing.connect += connect
+            timing.ttfb += elapsed - connect
+        return elapsed
 
-    # Validate arguments
-    if not (args.year or args.years):
-        parser.error("Must specify --year or --years")
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Issue a GET through the pooled session, respecting the rate limit."""
+        return self.request('GET', url, **kwargs)
 
-    if not (args.ensemble or args.ensemble_list):
-        parser.error("Must specify --ensemble or --list")
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """Issue a HEAD through the pooled session, respecting the rate limit."""
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('HEAD', url, **kwargs)
 
-    # Parse years
-    if args.years:
-        years = parse_year_range(args.years)
-    else:
-        years = [args.year]
+    def discard(self, response: requests.Response, limit: int = 64 * 1024):
+        """
+        Drain a small unwanted body (404 pages, mostly) so its connection goes
+        back to the pool. Closing a streamed response unread drops the
+        connection, and then the next job pays for a fresh handshake.
+        """
+        drained = 0
+        try:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                drained += len(chunk)
+                if drained > limit:
+                    break  # Not worth it - let this connection go
+        except requests.exceptions.RequestException:
+            pass
 
-    # Parse ensembles
-    if args.ensemble_list:
+    def close(self):
+        """Close every pooled connection."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+_default_transport: Optional[Transport] = None
+_default_transport_lock = threading.Lock()
+
+def get_default_transport() -> Transport:
+    """Shared transport for callers that don't bring their own."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = Transport()
+        return _default_transport
+
+# ============================================================================
+# NEGATIVE CACHE
+# ============================================================================
+
+@contextmanager
+def file_lock(path: Path):
+    """Hold an exclusive lock on `path` (created if need be) - across processes, and hosts on a shared volume."""
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
         try:
-            ensembles = load_ensemble_list(args.ensemble_list)
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def update_json_file(path: Path, merge, indent: Optional[int] = None):
+    """
+    Rewrite the JSON object at `path` as merge(what's there now) ({} if
+    nothing usable is), atomically and under `path`.lock. Processes sharing
+    an output directory (--queue workers on several hosts) each merge in
+    their own changes, so nobody's get lost to the last writer.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(path.with_name(f"{path.name}.lock")):
+        try:
+            with open(path, 'r') as f:
+                current = json.load(f)
+        except (FileNotFoundError, ValueError):
+            current = {}
+        payload = merge(current if isinstance(current, dict) else {})
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f, sort_keys=True, indent=indent)
+        os.replace(tmp_path, path)
+
+def merge_entries(entries, changes: dict) -> dict:
+    """`entries` (a dict, or anything else for none) with `changes` applied: a None value deletes its key."""
+    merged = dict(entries) if isinstance(entries, dict) else {}
+    for key, value in changes.items():
+        if value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = value
+    return merged
+
+class NegativeCache:
+    """
+    Remembers which (year, ensemble) combinations came back 404, so reruns of
+    the same batch don't ask the server about them again.
+
+    Misses for recent years expire after `recent_ttl` seconds, since programs
+    for this year's clinic may still be uploaded. Misses for years at least
+    `settled_age` years old use `settled_ttl`, which defaults to never.
+
+    Misses on a resolver's guessed spellings are remembered too, so they
+    aren't asked about again, but misses() leaves them out: they aren't
+    jobs, and the scheduler would count them against their years.
+
+    Stored as JSON in the output directory; safe to share across workers.
+    """
+
+    def __init__(self, path: Path, recent_ttl: float = RECENT_MISS_TTL,
+                 settled_ttl: Optional[float] = None, settled_age: int = SETTLED_YEAR_AGE):
+        self.path = Path(path)
+        self.recent_ttl = recent_ttl
+        self.settled_ttl = settled_ttl
+        self.settled_age = settled_age
+        self._misses = {}  # "year/ensemble" -> unix time of the 404
+        self._variants = set()  # the keys that are guessed spellings, not names from a list
+        self._changed = set()  # keys recorded or forgotten since the last save
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(year: int, ensemble: str) -> str:
+        return f"{year}/{ensemble}"
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self._misses = data.get('misses', {})
+            self._variants = set(data.get('variants', ())) & set(self._misses)
         except FileNotFoundError:
-            print(f"Error: File not found: {args.ensemble_list}")
-            sys.exit(1)
-    else:
-        ensembles = [args.ensemble]
+            pass
+        except (ValueError, AttributeError, TypeError):
+            # A corrupt cache only costs us some requests - start fresh
+            self._misses, self._variants = {}, set()
 
-    # Initialize UI and stats
-    ui = ScraperUI(boring=args.boring, chaos=args.chaos)
-    stats = Stats()
+    def ttl_for(self, year: int) -> Optional[float]:
+        """Seconds a miss for `year` stays valid (None = forever)."""
+        if datetime.now().year - year >= self.settled_age:
+            return self.settled_ttl
+        return self.recent_ttl
 
-    # Show startup banner
-    ui.print_startup()
+    def is_missing(self, year: int, ensemble: str) -> bool:
+        """True if this combination is a known, unexpired 404."""
+        with self._lock:
+            recorded = self._misses.get(self._key(year, ensemble))
+        if recorded is None:
+            return False
+        ttl = self.ttl_for(year)
+        return ttl is None or time.time() - recorded < ttl
 
-    # Calculate total jobs
-    total_jobs = len(years) * len(ensembles)
-    stats.total = total_jobs
-    current_job = 0
+    def misses(self) -> List[Tuple[int, str]]:
+        """Every (year, ensemble) that has ever come back 404, expired or not (guessed spellings aside)."""
+        with self._lock:
+            keys = [key for key in self._misses if key not in self._variants]
+        return [(int(year), ensemble) for year, _, ensemble in (key.partition('/') for key in keys)]
 
-    print(f"\n{ui._colorize(f'📋 Jobs queued: {total_jobs}', Colors.BOLD)}")
-    print(f"{ui._colorize(f'📅 Years: {len(years)}', Colors.BOLD)}")
-    print(f"{ui._colorize(f'🎺 Ensembles: {len(ensembles)}', Colors.BOLD)}\n")
+    def record_miss(self, year: int, ensemble: str, variant: bool = False):
+        """Remember a 404; `variant` if `ensemble` is a resolver's guess rather than a listed name."""
+        key = self._key(year, ensemble)
+        with self._lock:
+            self._misses[key] = time.time()
+            if variant:
+                self._variants.add(key)
+            else:
+                self._variants.discard(key)
+            self._changed.add(key)
 
-    # Main download loop
-    for year in years:
-        for ensemble in ensembles:
-            current_job += 1
+    def forget(self, year: int, ensemble: str):
+        with self._lock:
+            key = self._key(year, ensemble)
+            self._variants.discard(key)
+            if self._misses.pop(key, None) is not None:
+                self._changed.add(key)
 
-            # Show progress
-            ui.print_progress(current_job, total_jobs, str(year), ensemble)
+    def save(self):
+        """Merge this run's changes into the cache file (no-op if nothing changed)."""
+        with self._lock:
+            if not self._changed:
+                return
+            changes = {key: self._misses.get(key) for key in self._changed}
+            variants = self._variants & self._changed
+            self._changed = set()
 
-            # Download the program
-            download_program(year, ensemble, ui, stats)
+        def merge(current: dict) -> dict:
+            misses = merge_entries(current.get('misses'), changes)
+            kept = set(current.get('variants') or ()) - set(changes)
+            return {'version': 1, 'misses': misses, 'variants': sorted((kept | variants) & set(misses))}
+        update_json_file(self.path, merge)
 
-            # Rate limiting (be a good citizen)
-            if current_job < total_jobs:  # Don't wait after the last one
-                ui.print_rate_limit()
-                time.sleep(RATE_LIMIT_DELAY)
+# ============================================================================
+# ENSEMBLE NAME RESOLVER
+# ============================================================================
 
-    # Show final summary
-    ui.print_summary(stats)
+# CamelCase humps, ALLCAPS runs and digit runs: "UNTWindSymphony" -> UNT, Wind, Symphony
+_NAME_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_NAME_SEPARATORS = ('', '_', '-', ' ')
+
+def load_aliases(filepath: str) -> Dict[str, List[str]]:
+    """
+    Load an aliases file: one ensemble per line, its other published names
+    after an '=', comma separated ("NorthTexas = UNT, North_Texas"). Every
+    name on a line is an alias of all the others.
+    """
+    aliases = {}
+    with open(filepath, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name, _, others = line.partition('=')
+            group = [alias.strip() for alias in [name] + others.split(',') if alias.strip()]
+            for alias in group:
+                known = aliases.setdefault(alias, [])
+                known.extend(other for other in group if other != alias and other not in known)
+    return aliases
+
+def spelling_variants(name: str) -> List[str]:
+    """
+    The same words in other cases and with other separators, likeliest first:
+    'North_Texas' -> NorthTexas, North_Texas, North-Texas, North Texas, northtexas, ...
+    """
+    words = _NAME_WORD.findall(name)
+    if not words:
+        return []
+    cases = (words, [word[:1].upper() + word[1:] for word in words],
+             [word.lower() for word in words], [word.upper() for word in words])
+    variants = [separator.join(case) for case in cases for separator in _NAME_SEPARATORS]
+    return [variant for variant in dict.fromkeys(variants) if variant != name]
+
+class NameResolver:
+    """
+    Works out which spelling a program was actually published under.
+
+    List names have to match the URL exactly, but the same band shows up as
+    `NorthTexas` one year and `UNT` or `North_Texas` the next. candidates()
+    orders the spellings worth trying by how likely they are: the name this
+    program already resolved to, the names the ensemble resolved to in the
+    nearest other years, the list name, the aliases file, and finally case
+    and separator variants of all of those. The caller fetches the first one
+    directly and search()es the rest with cheap HEAD requests, stopping at the
+    first hit.
+
+    Whatever resolves is remembered per (year, ensemble), so the next run (and
+    the neighbouring years) start from the right name. Stored as JSON in the
+    output directory; safe to share across workers.
+    """
+
+    def __init__(self, path: Path, aliases: Optional[Dict[str, List[str]]] = None,
+                 max_variants: int = MAX_NAME_VARIANTS):
+        self.path = Path(path)
+        self.aliases = aliases or {}
+        self.max_variants = max_variants
+        self._names = {}  # "year/ensemble" -> name the program is published under
+        self._changed = set()  # keys remembered since the last save
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(year: int, ensemble: str) -> str:
+        return f"{year}/{ensemble}"
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self._names = json.load(f).get('names', {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, AttributeError):
+            # Losing these only costs us some requests - start fresh
+            self._names = {}
+
+    def resolved(self, year: int, ensemble: str) -> Optional[str]:
+        """The name this program was found under last time, if we know it."""
+        with self._lock:
+            return self._names.get(self._key(year, ensemble))
+
+    def candidates(self, year: int, ensemble: str) -> List[str]:
+        """Spellings to try for this program, likeliest first (the list name is always among them)."""
+        suffix = f"/{ensemble}"
+        with self._lock:
+            history = sorted((abs(int(key[:-len(suffix)]) - year), -int(key[:-len(suffix)]), name)
+                             for key, name in self._names.items() if key.endswith(suffix))
+        names = [name for _, _, name in history] + [ensemble] + self.aliases.get(ensemble, [])
+        for name in list(names):
+            names.extend(spelling_variants(name))
+        names = list(dict.fromkeys(names))
+        if ensemble not in names[:self.max_variants]:
+            names.insert(self.max_variants - 1, ensemble)
+        return names[:self.max_variants]
+
+    def remember(self, year: int, ensemble: str, name: str):
+        with self._lock:
+            key = self._key(year, ensemble)
+            if self._names.get(key) != name:
+                self._names[key] = name
+                self._changed.add(key)
+
+    def search(self, year: int, ensemble: str, names: List[str], transport: Transport,
+               negative_cache: Optional[NegativeCache] = None) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        Probe `names` in order until one exists.
+
+        Returns:
+            (name, Content-Length) for the first hit, or None. Misses go into
+            the negative cache, so a rerun doesn't ask about them again.
+        """
+        for name in names:
+            url = BASE_URL.format(year=year, ensemble=quote(name))
+            try:
+                status, length = probe_url(url, transport)
+            except requests.exceptions.RequestException:
+                continue  # Not a verdict either way - try the next one
+            if status == 200:
+                if negative_cache is not None:
+                    negative_cache.forget(year, name)
+                self.remember(year, ensemble, name)
+                return name, length
+            if status == 404 and negative_cache is not None:
+                negative_cache.record_miss(year, name, variant=name != ensemble)
+        return None
+
+    def save(self):
+        """Merge the names resolved since the last save into the file (no-op if there are none)."""
+        with self._lock:
+            if not self._changed:
+                return
+            changes = {key: self._names[key] for key in self._changed}
+            self._changed = set()
+        update_json_file(self.path,
+                         lambda current: {'version': 1, 'names': merge_entries(current.get('names'), changes)},
+                         indent=1)
+
+def candidate_names(year: int, ensemble: str, resolver: Optional[NameResolver],
+                    negative_cache: Optional[NegativeCache]) -> List[str]:
+    """Names worth asking the server about for this program, likeliest first (empty = all known 404s)."""
+    names = resolver.candidates(year, ensemble) if resolver is not None else [ensemble]
+    if negative_cache is not None:
+        names = [name for name in names if not negative_cache.is_missing(year, name)]
+    return names
+
+class DiscoveredLinks:
+    """
+    The URLs --discover found programs at, per (year, ensemble).
+
+    A listing page can link a program from anywhere - another path, a CDN,
+    an older site layout - where BASE_URL would never look. Downloads try the
+    link instead of building a URL, and a link that 404s is dropped so the
+    usual guessing (and the negative cache) take over again. Stored as JSON
+    in the output directory; safe to share across workers.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._links = {}  # "year/ensemble" -> URL
+        self._changed = set()  # keys added or forgotten since the last save
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(year: int, ensemble: str) -> str:
+        return f"{year}/{ensemble}"
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self._links = json.load(f).get('links', {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, AttributeError):
+            # Losing these only costs us the links - rerun --discover
+            self._links = {}
+
+    def get(self, year: int, ensemble: str) -> Optional[str]:
+        with self._lock:
+            return self._links.get(self._key(year, ensemble))
+
+    def update(self, links: Dict[Tuple[int, str], str]):
+        with self._lock:
+            for (year, ensemble), url in links.items():
+                key = self._key(year, ensemble)
+                self._links[key] = url
+                self._changed.add(key)
+
+    def forget(self, year: int, ensemble: str):
+        with self._lock:
+            key = self._key(year, ensemble)
+            if self._links.pop(key, None) is not None:
+                self._changed.add(key)
+
+    def save(self):
+        """Merge the links added or forgotten since the last save into the file (no-op if none were)."""
+        with self._lock:
+            if not self._changed:
+                return
+            changes = {key: self._links.get(key) for key in self._changed}
+            self._changed = set()
+        update_json_file(self.path,
+                         lambda current: {'version': 1, 'links': merge_entries(current.get('links'), changes)},
+                         indent=1)
+
+# ============================================================================
+# DOWNLOAD MANIFEST
+# ============================================================================
+
+def program_filename(year: int, ensemble: str) -> str:
+    """The on-disk name for a program PDF."""
+    return f"{year}_{ensemble}_Concert.pdf"
+
+def parse_program_filename(filename: str) -> Optional[Tuple[int, str]]:
+    """Reverse of program_filename: '2009_USAF_Concert.pdf' -> (2009, 'USAF')."""
+    suffix = "_Concert.pdf"
+    year, sep, rest = filename.partition('_')
+    if not (sep and year.isdigit() and rest.endswith(suffix) and len(rest) > len(suffix)):
+        return None
+    return int(year), rest[:-len(suffix)]
+
+def file_sha256(filepath: Path, chunk_size: int = CHUNK_SIZE) -> str:
+    """SHA-256 of a file on disk, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class Manifest:
+    """
+    SQLite record of every program we have: where it is, where it came from,
+    how big it is, its SHA-256, the HTTP status and validators, and when.
+
+    The batch loop loads it once to drop already-satisfied jobs in bulk instead
+    of stat()ing every file, and download_program writes a row in its own
+    transaction after each file lands. Safe to share across workers, and
+    across --queue hosts sharing the output directory: like WorkQueue it uses
+    SQLite's rollback journal, since WAL needs shared memory.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS downloads (
+            year INTEGER NOT NULL,
+            ensemble TEXT NOT NULL,
+            path TEXT NOT NULL,
+            url TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            status INTEGER,
+            etag TEXT,
+            last_modified TEXT,
+            downloaded_at REAL NOT NULL,
+            PRIMARY KEY (year, ensemble)
+        )
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.created = not self.path.exists()
+        self._lock = threading.Lock()
+        # Wait out other workers' writes; switch back a manifest an older version left in WAL mode
+        self._conn = sqlite3.connect(str(self.path), timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        with self._conn:
+            self._conn.execute(self.SCHEMA)
+
+    def satisfied(self) -> set:
+        """Every (year, ensemble) we already have."""
+        with self._lock:
+            return set(self._conn.execute("SELECT year, ensemble FROM downloads"))
+
+    def programs(self) -> List[Tuple[int, str, str, str]]:
+        """(year, ensemble, path, sha256) for every program, in year order."""
+        with self._lock:
+            return list(self._conn.execute(
+                "SELECT year, ensemble, path, sha256 FROM downloads ORDER BY year, ensemble"))
+
+    def record(self, year: int, ensemble: str, filepath: Path, url: str, size: int, sha256: str,
+               status: Optional[int] = None, etag: Optional[str] = None,
+               last_modified: Optional[str] = None, downloaded_at: Optional[float] = None):
+        """Insert or replace the row for one program, atomically."""
+        row = (year, ensemble, str(filepath), url, size, sha256, status, etag, last_modified,
+               downloaded_at if downloaded_at is not None else time.time())
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def rebuild(self, output_dir: Path) -> int:
+        """
+        Re-sync the manifest with what's actually in `output_dir`: adopt every
+        program PDF found there (hashing it) and drop rows whose file is gone
+        or isn't really a PDF.
+        Existing rows for files that are still there keep their metadata.
+
+        Returns:
+            Number of programs in the manifest afterwards
+        """
+        found = {}
+        for filepath in sorted(Path(output_dir).glob("*/*_Concert.pdf")):
+            parsed = parse_program_filename(filepath.name)
+            # An error page saved as a PDF isn't a program we have
+            if parsed and str(parsed[0]) == filepath.parent.name and looks_like_pdf(filepath):
+                found[parsed] = filepath
+
+        with self._lock:
+            known = {(year, ensemble): size for year, ensemble, size in
+                     self._conn.execute("SELECT year, ensemble, size FROM downloads")}
+
+        for (year, ensemble), filepath in found.items():
+            stat = filepath.stat()
+            if known.get((year, ensemble)) == stat.st_size:
+                continue  # Already tracked and unchanged on disk
+            url = BASE_URL.format(year=year, ensemble=quote(ensemble))
+            self.record(year, ensemble, filepath, url, stat.st_size, file_sha256(filepath),
+                        downloaded_at=stat.st_mtime)
+
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM downloads WHERE year = ? AND ensemble = ?",
+                                   [key for key in known if key not in found])
+        return len(found)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# ============================================================================
+# CONTENT-ADDRESSED STORE
+# ============================================================================
+
+class BlobStore:
+    """
+    Keeps each distinct program PDF once, as `{root}/{sha[:2]}/{sha}.pdf`.
+    Every programs/{year}/ path with the same bytes is a hard link to that
+    blob (or a relative symlink where hard links aren't possible), so a
+    program re-posted under another year or spelling costs a directory entry
+    instead of another copy.
+
+    Downloads never write into a finished file - they replace it - so one
+    path getting a new version can't change the others sharing its blob.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / f"{sha256}.pdf"
+
+    def _link(self, blob: Path, filepath: Path):
+        """Atomically swap `filepath` for a link to `blob`."""
+        tmp_path = filepath.with_name(f".{filepath.name}.link.tmp")
+        if os.path.lexists(tmp_path):
+            tmp_path.unlink()
+        try:
+            os.link(blob, tmp_path)
+        except OSError:
+            os.symlink(os.path.relpath(blob, filepath.parent), tmp_path)
+        os.replace(tmp_path, filepath)
+
+    def adopt(self, filepath: Path, sha256: str) -> bool:
+        """
+        Make `filepath` share storage with the blob for `sha256`, creating the
+        blob from it if this is the first copy we've seen.
+
+        Returns:
+            True if an existing blob was reused (the file's space is saved)
+        """
+        blob = self.blob_path(sha256)
+        with self._lock:  # Two workers may finish identical files at once
+            if blob.exists():
+                if os.path.samefile(blob, filepath):
+                    return False  # Already linked
+                self._link(blob, filepath)
+                return True
+
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(filepath, blob)
+            except OSError:
+                # No hard links here: the store keeps the bytes, the program path points at them
+                os.replace(filepath, blob)
+                try:
+                    self._link(blob, filepath)
+                except OSError:
+                    os.replace(blob, filepath)  # Can't link at all - leave things as they were
+                    raise
+            return False
+
+    def prune(self, keep: set) -> Tuple[int, int]:
+        """
+        Delete blobs whose SHA-256 isn't in `keep` (left behind when a program
+        was re-downloaded or deleted).
+
+        Returns:
+            (blobs removed, bytes freed)
+        """
+        removed = freed = 0
+        with self._lock:
+            for blob in self.root.glob("*/*.pdf"):
+                if blob.stem not in keep:
+                    freed += blob.stat().st_size
+                    blob.unlink()
+                    removed += 1
+        return removed, freed
+
+def dedupe_programs(output_dir: Path, store: BlobStore) -> dict:
+    """
+    Convert an existing programs/ tree to the blob store: hash every program,
+    link identical ones to a single blob, and prune blobs nothing uses.
+
+    Returns:
+        Counts for the report: programs, blobs, duplicates, bytes saved, blobs pruned
+    """
+    programs = duplicates = saved = 0
+    digests = set()
+    for filepath in sorted(Path(output_dir).glob("*/*_Concert.pdf")):
+        parsed = parse_program_filename(filepath.name)
+        if not parsed or str(parsed[0]) != filepath.parent.name:
+            continue
+        sha256 = file_sha256(filepath)
+        size = filepath.stat().st_size
+        programs += 1
+        digests.add(sha256)
+        if store.adopt(filepath, sha256):
+            duplicates += 1
+            saved += size
+    pruned, _ = store.prune(digests)
+    return {'programs': programs, 'blobs': len(digests), 'duplicates': duplicates,
+            'bytes_saved': saved, 'pruned': pruned}
+
+# ============================================================================
+# SCHEDULING
+# ============================================================================
+
+class JobGrid:
+    """
+    Every year x ensemble combination except the ones in `exclude`,
+    generated as it's iterated instead of built as a list up front. Sized
+    and re-iterable, which is all run_pool needs, so a huge grid costs its
+    two axes plus `exclude` rather than a tuple per job.
+    """
+
+    def __init__(self, years: List[int], ensembles: List[str], exclude: frozenset = frozenset()):
+        self.years = years
+        self.ensembles = ensembles
+        self.exclude = exclude
+        self._year_set, ensemble_counts = set(years), Counter(ensembles)
+        excluded = sum(ensemble_counts[ensemble] for year, ensemble in exclude if year in self._year_set)
+        self._len = len(years) * len(ensembles) - excluded
+        self._ensemble_set = set(ensemble_counts)
+
+    def without(self, jobs) -> 'JobGrid':
+        """The same grid minus `jobs` as well."""
+        return JobGrid(self.years, self.ensembles, self.exclude | frozenset(jobs))
+
+    def __iter__(self):
+        for year in self.years:
+            for ensemble in self.ensembles:
+                if (year, ensemble) not in self.exclude:
+                    yield year, ensemble
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, job) -> bool:
+        year, ensemble = job
+        return year in self._year_set and ensemble in self._ensemble_set and job not in self.exclude
+
+class JobScheduler:
+    """
+    Hands out the job grid likeliest-hit first instead of year by year, so
+    the programs that exist come in early and an interrupted (or budgeted)
+    run has most of them.
+
+    A job's score is its ensemble's hit rate times its year's hit rate,
+    relative to the overall rate, boosted when the ensemble has a hit in a
+    nearby year (bands come back). Rates are smoothed towards the overall
+    rate so one lucky hit doesn't dominate. History is the manifest (hits)
+    and the negative cache (404s); record() keeps learning during the run,
+    so a hit in 2015 pulls 2014 and 2016 forward straight away. With no
+    history at all, jobs come out in grid order.
+
+    Iterate it for the jobs, always the best one left; scores are kept in a
+    heap and only the jobs an outcome affects are re-scored. The grid itself
+    (a lazy JobGrid, usually) is never built: at most `window` jobs are
+    weighed at once, and another is pulled from the grid each time one goes
+    out - so on a grid bigger than the window, "best" means best of the next
+    `window` jobs in grid order. Safe to record() from worker threads while
+    iterating.
+    """
+
+    def __init__(self, jobs: Iterable[Tuple[int, str]], hits: Iterable[Tuple[int, str]] = (),
+                 misses: Iterable[Tuple[int, str]] = (), window: int = SCHEDULER_WINDOW):
+        self.grid = jobs  # the jobs in grid order, as given (not copied)
+        self.window = window
+        hits = set(hits)
+        self._known_misses = set(misses) - hits
+        self._ensemble_hits, self._ensemble_tries = Counter(), Counter()
+        self._year_hits, self._year_tries = Counter(), Counter()
+        self._hit_years = defaultdict(set)
+        for year, ensemble in hits:
+            self._count(year, ensemble, True)
+        for year, ensemble in self._known_misses:
+            self._count(year, ensemble, False)
+        tries = len(hits) + len(self._known_misses)
+        self._prior = (len(hits) + PRIOR_WEIGHT * PRIOR_HIT_RATE) / (tries + PRIOR_WEIGHT)
+
+        self._source = iter(jobs)
+        self._pulled = 0
+        self._jobs = {}  # index -> job, for the jobs pulled in and not handed out yet
+        self._by_ensemble = defaultdict(set)  # ensemble -> indexes of those jobs
+        self._by_year = defaultdict(set)
+        self._versions = {}  # index -> how many times it's been re-scored (stale heap entries are skipped)
+        self._heap = []
+        self._lock = threading.Lock()
+        self._fill()
+
+    def _fill(self):
+        """Pull jobs from the grid until the window is full (lock held, or still in __init__)."""
+        while len(self._jobs) < self.window:
+            job = next(self._source, None)
+            if job is None:
+                return
+            index = self._pulled
+            self._pulled += 1
+            year, ensemble = job
+            self._jobs[index] = job
+            self._by_ensemble[ensemble].add(index)
+            self._by_year[year].add(index)
+            self._versions[index] = 0
+            heapq.heappush(self._heap, (-self.score(year, ensemble), index, 0))
+
+    def _count(self, year: int, ensemble: str, hit: bool):
+        self._ensemble_tries[ensemble] += 1
+        self._year_tries[year] += 1
+        if hit:
+            self._ensemble_hits[ensemble] += 1
+            self._year_hits[year] += 1
+            self._hit_years[ensemble].add(year)
+
+    def _rate(self, hits: int, tries: int) -> float:
+        return (hits + PRIOR_WEIGHT * self._prior) / (tries + PRIOR_WEIGHT)
+
+    def score(self, year: int, ensemble: str) -> float:
+        """How likely this job is to find a program (only the order matters)."""
+        if (year, ensemble) in self._known_misses:
+            return 0.0
+        score = (self._rate(self._ensemble_hits[ensemble], self._ensemble_tries[ensemble])
+                 * self._rate(self._year_hits[year], self._year_tries[year]) / self._prior)
+        distances = [abs(year - hit_year) for hit_year in self._hit_years[ensemble] if hit_year != year]
+        if distances:
+            score *= 1 + ADJACENCY_BOOST / min(distances)
+        return score
+
+    def record(self, job: Tuple[int, str], hit: bool):
+        """Learn from one finished job and re-score the jobs it says something about."""
+        year, ensemble = job
+        with self._lock:
+            self._count(year, ensemble, hit)
+            if not hit:
+                self._known_misses.add(job)
+            for index in self._by_ensemble[ensemble] | self._by_year[year]:
+                self._versions[index] += 1
+                heapq.heappush(self._heap, (-self.score(*self._jobs[index]), index, self._versions[index]))
+            if len(self._heap) > 4 * len(self._versions):
+                # Mostly stale entries by now - rebuild from the live ones
+                self._heap = [entry for entry in self._heap if self._versions.get(entry[1]) == entry[2]]
+                heapq.heapify(self._heap)
+
+    def _pop(self) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            while self._heap:
+                _, index, version = heapq.heappop(self._heap)
+                if self._versions.get(index) != version:
+                    continue
+                del self._versions[index]
+                job = self._jobs.pop(index)
+                year, ensemble = job
+                self._by_ensemble[ensemble].discard(index)
+                self._by_year[year].discard(index)
+                self._fill()
+                return job
+        return None
+
+    def __iter__(self):
+        while True:
+            job = self._pop()
+            if job is None:
+                return
+            yield job
+
+    def __len__(self) -> int:
+        return len(self.grid)
+
+class Budget:
+    """
+    When to stop starting new jobs: after `max_requests` HTTP requests
+    through `transport` or `max_time` seconds, whichever comes first. Jobs
+    already running get to finish, so a run can go slightly over.
+    """
+
+    def __init__(self, transport: Transport, max_requests: Optional[int] = None, max_time: Optional[float] = None):
+        self.transport = transport
+        self.max_requests = max_requests
+        self.max_time = max_time
+        self._requests_before = transport.requests_sent
+        self._start = time.monotonic()
+
+    def spent(self) -> Optional[str]:
+        """What ran out, or None while there's budget left."""
+        if self.max_requests is not None and self.transport.requests_sent - self._requests_before >= self.max_requests:
+            return f"{self.max_requests} requests"
+        if self.max_time is not None and time.monotonic() - self._start >= self.max_time:
+            return f"{self.max_time:g}s"
+        return None
+
+# ============================================================================
+# SHARED WORK QUEUE
+# ============================================================================
+
+# Job outcomes (JobTiming.outcome) that leave a queued job failed rather than done
+QUEUE_FAILED_OUTCOMES = ('network_error', 'http_error', 'invalid_pdf')
+
+class WorkQueue:
+    """
+    A year x ensemble job grid in a SQLite file that any number of scraper
+    processes - on this host or others, via a shared volume - drain together.
+
+    Workers claim() one job at a time under a lease, renew their leases with
+    heartbeat() while they work, and finish() each job with its outcome. A
+    worker that dies stops renewing, its leases expire, and the job goes to
+    whoever claims next; a job whose lease has expired `max_leases` times is
+    marked failed instead of taking down every worker in turn. Claims happen
+    in one BEGIN IMMEDIATE transaction, so no two workers get the same job.
+
+    Uses SQLite's rollback journal rather than WAL, which needs shared memory
+    and so only works within one host.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            year INTEGER NOT NULL,
+            ensemble TEXT NOT NULL,
+            priority REAL NOT NULL DEFAULT 0,
+            state TEXT NOT NULL DEFAULT 'pending',
+            owner TEXT,
+            lease_expires REAL,
+            leases INTEGER NOT NULL DEFAULT 0,
+            outcome TEXT,
+            updated_at REAL,
+            PRIMARY KEY (year, ensemble)
+        )
+    """
+
+    def __init__(self, path: Path, lease: float = LEASE_SECONDS, max_leases: int = MAX_LEASES):
+        self.path = Path(path)
+        self.lease = lease
+        self.max_leases = max_leases
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit, so we can BEGIN IMMEDIATE ourselves; wait out other workers' locks
+        self._conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute(self.SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def add(self, jobs: List[Tuple[int, str]], priorities: Optional[List[float]] = None) -> int:
+        """
+        Queue jobs (higher priority is claimed first). Jobs already queued
+        keep their place, except failed ones, which go back to pending.
+
+        Returns:
+            How many jobs are newly pending
+        """
+        priorities = priorities or [0.0] * len(jobs)
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.execute("SELECT COUNT(*) FROM jobs WHERE state = 'pending'").fetchone()[0]
+            conn.executemany("INSERT OR IGNORE INTO jobs (year, ensemble, priority, updated_at) VALUES (?, ?, ?, ?)",
+                             [(year, ensemble, priority, now) for (year, ensemble), priority in zip(jobs, priorities)])
+            conn.executemany("UPDATE jobs SET state = 'pending', owner = NULL, leases = 0, updated_at = ? "
+                             "WHERE year = ? AND ensemble = ? AND state = 'failed'",
+                             [(now, year, ensemble) for year, ensemble in jobs])
+            after = conn.execute("SELECT COUNT(*) FROM jobs WHERE state = 'pending'").fetchone()[0]
+        return after - before
+
+    def claim(self, owner: str) -> Optional[Tuple[int, str]]:
+        """Lease the best pending (or abandoned) job to `owner`; None if there's nothing to take right now."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET state = 'failed', outcome = 'abandoned', owner = NULL, updated_at = ? "
+                         "WHERE state = 'leased' AND lease_expires < ? AND leases >= ?", (now, now, self.max_leases))
+            row = conn.execute("SELECT year, ensemble FROM jobs "
+                               "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                               "ORDER BY priority DESC, rowid LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET state = 'leased', owner = ?, lease_expires = ?, leases = leases + 1, "
+                         "updated_at = ? WHERE year = ? AND ensemble = ?", (owner, now + self.lease, now) + row)
+        return row[0], row[1]
+
+    def heartbeat(self, owner: str) -> int:
+        """Extend every lease `owner` holds. Returns how many it holds."""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute("UPDATE jobs SET lease_expires = ? WHERE owner = ? AND state = 'leased'",
+                                (now + self.lease, owner)).rowcount
+
+    def finish(self, job: Tuple[int, str], owner: str, outcome: str):
+        """Record how a job went (even if our lease lapsed meanwhile - the work is done either way)."""
+        state = 'failed' if outcome in QUEUE_FAILED_OUTCOMES else 'done'
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET state = ?, outcome = ?, owner = ?, lease_expires = NULL, updated_at = ? "
+                         "WHERE year = ? AND ensemble = ? AND state != 'done'",
+                         (state, outcome, owner, time.time()) + tuple(job))
+
+    def release(self, owner: str) -> int:
+        """Hand back every job `owner` still holds (a clean shutdown mid-job). Returns how many."""
+        with self._transaction() as conn:
+            return conn.execute("UPDATE jobs SET state = 'pending', owner = NULL, lease_expires = NULL, "
+                                "leases = MAX(leases - 1, 0) WHERE owner = ? AND state = 'leased'", (owner,)).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Jobs per state: pending, leased, done, failed."""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in ('pending', 'leased', 'done', 'failed')}
+        counts.update(rows)
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class QueueLease:
+    """
+    Feeds run_pool from a WorkQueue: each job is claimed as a worker gets to
+    it, and a background thread renews this process's leases every third of
+    the lease time.
+
+    When nothing is left to claim but other workers still hold leases, it
+    waits - if one of them dies, its jobs come back to us once the lease
+    runs out - and stops only when the queue is drained.
+    """
+
+    def __init__(self, work_queue: WorkQueue, owner: Optional[str] = None):
+        self.queue = work_queue
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        counts = work_queue.counts()
+        self._total = counts['pending'] + counts['leased']
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._renew, name="queue-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _renew(self):
+        while not self._stop.wait(self.queue.lease / 3):
+            try:
+                self.queue.heartbeat(self.owner)
+            except sqlite3.Error:
+                pass  # Busy or briefly unreachable - the next beat may get through
+
+    def __iter__(self):
+        while not self._stop.is_set():
+            job = self.queue.claim(self.owner)
+            if job is not None:
+                yield job
+                continue
+            if not self.queue.counts()['leased']:
+                return
+            self._stop.wait(min(self.queue.lease / 4, 5.0))  # Someone else is still busy - see if they finish
+
+    def __len__(self) -> int:
+        return self._total
+
+    def record(self, job: Tuple[int, str], outcome: str):
+        self.queue.finish(job, self.owner, outcome)
+
+    def close(self):
+        """Stop renewing and hand back anything unfinished."""
+        self._stop.set()
+        self._heartbeat.join()
+        self.queue.release(self.owner)
+
+# ============================================================================
+# CHECKPOINT JOURNAL
+# ============================================================================
+
+class Journal:
+    """
+    Append-only record of a batch run, so a killed run can pick up where it
+    stopped instead of re-asking about every job it already got through.
+
+    The first line describes the run (which jobs, how many); after that,
+    one line per finished job with its outcome and exactly what it added
+    to Stats, and a closing line if the run completed. Each line is written
+    as soon as its job finishes, so killing the process loses nothing; the
+    fsync that makes it survive a power cut is batched (every `sync_every`
+    jobs or `sync_interval` seconds) to keep the cost off the hot path. A
+    torn last line is ignored on replay. Safe to record() from workers.
+    """
+
+    def __init__(self, path: Path, sync_every: int = JOURNAL_SYNC_EVERY,
+                 sync_interval: float = JOURNAL_SYNC_SECONDS):
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def replay(path: Path) -> Optional[dict]:
+        """
+        Read a journal back.
+
+        Returns:
+            None if there's no journal, else {'run': the first line, 'done': set of
+            finished (year, ensemble) jobs, 'stats': summed Stats counters,
+            'finished': whether the run completed}
+        """
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        state = {'run': None, 'done': set(), 'stats': Counter(), 'finished': False}
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn by the crash we're resuming from
+                if entry['type'] == 'run':
+                    state['run'] = entry
+                elif entry['type'] == 'job':
+                    state['done'].add((entry['year'], entry['ensemble']))
+                    state['stats'].update(entry['stats'])
+                elif entry['type'] == 'end':
+                    state['finished'] = True
+        return state if state['run'] is not None else None
+
+    @staticmethod
+    def unfinished(path: Path) -> bool:
+        """True if `path` holds a run with no closing line yet: killed, budgeted or still going."""
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return False
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            f.seek(max(0, end - 65536))
+            lines = f.read().split(b'\n')
+        for line in reversed(lines):
+            try:
+                return json.loads(line).get('type') != 'end'
+            except (ValueError, AttributeError):
+                continue  # Torn, blank, or cut off by the seek
+        return False  # Nothing readable - nothing --resume could use either
+
+    def start(self, spec: dict, total: int):
+        """Begin a fresh journal for a new run (the previous run's is replaced)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write({'type': 'run', 'version': 1, 'started': time.time(), 'jobs': spec, 'total': total})
+        self._sync()
+
+    def reopen(self):
+        """Carry on appending to the existing journal (--resume), minus any line the crash tore."""
+        with open(self.path, 'r+b') as f:
+            # Cut back to just after the last newline, or the first new line
+            # would be glued onto the torn one and lost with it on the next replay
+            end = position = f.seek(0, os.SEEK_END)
+            keep = 0
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b'\n')
+                if newline >= 0:
+                    keep = start + newline + 1
+                    break
+                position = start
+            if keep < end:
+                f.truncate(keep)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _write(self, entry: dict):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()  # In the OS's hands now - survives the process being killed
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def record(self, job: Tuple[int, str], outcome: str, counts: dict):
+        """Note a finished job, with what it added to Stats (zero counters are left out)."""
+        entry = {'type': 'job', 'year': job[0], 'ensemble': job[1], 'outcome': outcome,
+                 'stats': {name: count for name, count in counts.items() if count and name != 'total'}}
+        with self._lock:
+            self._write(entry)
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+
+    def finish(self):
+        """Mark the run complete (there's nothing left for --resume to do)."""
+        with self._lock:
+            self._write({'type': 'end', 'finished': time.time()})
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+# ============================================================================
+# JSONL EVENT OUTPUT
+# ============================================================================
+
+class EventLog:
+    """
+    The --output jsonl stream for tooling: one compact JSON line per
+    finished job, then a summary line. No reactions, no colors, no progress.
+
+        {"type":"job","year":2019,"ensemble":"USAF","url":"https://...","outcome":"downloaded",
+         "status":200,"bytes":1843712,"duration":1.204,"path":"programs/2019/2019_USAF_Concert.pdf"}
+        {"type":"summary","success":1,"skipped":0,...,"duration":1.51}
+
+    Lines are buffered and handed to the reader every EVENT_FLUSH_SECONDS
+    (and at the end), so a run of thousands of jobs doesn't pay a write per
+    job. If the reader goes away we stop writing - the jobs still finish.
+    Safe to call from multiple workers.
+    """
+
+    def __init__(self, out, flush_seconds: float = EVENT_FLUSH_SECONDS):
+        self._out = out
+        self._owns_out = out is not sys.stdout  # a file we opened, rather than stdout
+        self.flush_seconds = flush_seconds
+        self.started = time.monotonic()
+        self._last_flush = self.started
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def job(self, job: Tuple[int, str], outcome: str, timing: JobTiming, path: Optional[Path]):
+        """One finished job. `path` is where the program is on disk, if it is."""
+        year, ensemble = job
+        self._emit({'type': 'job', 'year': year, 'ensemble': ensemble, 'url': timing.url, 'outcome': outcome,
+                    'status': timing.status, 'bytes': timing.bytes, 'duration': round(timing.total, 3),
+                    'path': str(path) if path is not None else None})
+
+    def skipped(self, job: Tuple[int, str], path: Path):
+        """A job never started because the manifest already has its program."""
+        year, ensemble = job
+        self._emit({'type': 'job', 'year': year, 'ensemble': ensemble, 'url': None, 'outcome': 'skipped',
+                    'status': None, 'bytes': 0, 'duration': 0.0, 'path': str(path)})
+
+    def summary(self, stats: Stats):
+        """The final event: the run's totals, like the summary box."""
+        event = {'type': 'summary'}
+        event.update(stats.to_dict())
+        event['duration'] = round(time.monotonic() - self.started, 3)
+        self._emit(event, flush=True)
+
+    def _emit(self, event: dict, flush: bool = False):
+        line = json.dumps(event, ensure_ascii=False, separators=(',', ':')) + "\n"
+        with self._lock:
+            if self.closed:
+                return
+            try:
+                self._out.write(line)
+                now = time.monotonic()
+                if flush or now - self._last_flush >= self.flush_seconds:
+                    self._out.flush()
+                    self._last_flush = now
+            except OSError:  # BrokenPipeError: `| head` has seen enough
+                self.closed = True
+
+    def close(self):
+        """Flush what's buffered (and close the file, if it isn't stdout)."""
+        with self._lock:
+            try:
+                if not self.closed:
+                    self._out.flush()
+                if self._owns_out:
+                    self._out.close()
+            except OSError:
+                pass
+            self.closed = True
+
+# ============================================================================
+# THE UNHINGED UI ENGINE
+# ============================================================================
+
+_STOP_RENDERING = object()
+
+def _rendered(method):
+    """
+    Make a ScraperUI method safe to call from any worker.
+
+    While the renderer thread is running, the call is queued and returns
+    immediately, and the renderer does the formatting and printing. Otherwise
+    it runs right away under the output lock. A quiet UI drops the call.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.quiet:
+            return None  # Not even formatted - --output jsonl reports the results instead
+        events = self._events
+        if events is not None and threading.current_thread() is not self._renderer:
+            events.put((method, args, kwargs))
+            return None
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class ScraperUI:
+    """
+    Handles all the PERSONALITY, without ever making a download wait for it.
+
+    Inside `with ui.rendering():` every print_* call becomes an event on a
+    queue. One renderer thread formats and prints them in order, so messages
+    from different workers never interleave. On a terminal, progress becomes a
+    single live status line, and a backlog of progress updates collapses into
+    the latest one.
+    """
+
+    def __init__(self, boring: bool = False, chaos: bool = False, live: Optional[bool] = None, out=None,
+                 quiet: bool = False):
+        self.boring = boring
+        self.chaos = chaos
+        self.quiet = quiet  # print nothing at all
+        self.colors_enabled = not boring
+        self.out = out  # None = whatever sys.stdout is at the time
+        self.live = (out or sys.stdout).isatty() if live is None else live
+        # Multi-line messages must not interleave
+        self._lock = threading.RLock()
+        self._events = None  # queue.Queue while the renderer runs
+        self._renderer = None
+        self._status = ""  # the live progress line, when there is one
+
+    @contextmanager
+    def rendering(self):
+        """Run the renderer thread for the duration of the block, then drain it."""
+        self._events = queue.Queue()
+        self._renderer = threading.Thread(target=self._render_loop, args=(self._events,),
+                                          name="scraper-ui", daemon=True)
+        self._renderer.start()
+        try:
+            yield self
+        finally:
+            events, renderer = self._events, self._renderer
+            self._events = None  # From here on, calls print directly (under the lock)
+            events.put(_STOP_RENDERING)
+            renderer.join()
+            self._renderer = None
+
+    def _render_loop(self, events: queue.Queue):
+        while True:
+            batch = [events.get()]
+            while True:
+                try:
+                    batch.append(events.get_nowait())
+                except queue.Empty:
+                    break
+
+            # On a live line only the newest progress update is worth drawing
+            last_progress = None
+            if self.live:
+                for index, item in enumerate(batch):
+                    if item is not _STOP_RENDERING and item[0].__name__ == 'print_progress':
+                        last_progress = index
+
+            stopping = False
+            for index, item in enumerate(batch):
+                if item is _STOP_RENDERING:
+                    stopping = True
+                    continue
+                method, args, kwargs = item
+                if method.__name__ == 'print_progress' and last_progress is not None and index != last_progress:
+                    continue
+                with self._lock:
+                    self._clear_status()
+                    method(self, *args, **kwargs)
+                    self._draw_status()
+
+            if stopping:
+                with self._lock:
+                    self._clear_status()
+                    self._status = ""
+                return
+
+    def _print(self, *args, **kwargs):
+        print(*args, file=self.out, **kwargs)
+
+    def _clear_status(self):
+        if self.live and self._status:
+            self._print('\r\033[K', end='')
+
+    def _draw_status(self):
+        if self.live and self._status:
+            self._print(f"\r{self._status}", end='', flush=True)
+
+    def _can_dawdle(self) -> bool:
+        """Dramatic pauses are only allowed on an idle renderer - never on a download thread."""
+        return threading.current_thread() is self._renderer and self._events is not None and self._events.empty()
+
+    def _colorize(self, text: str, color: str) -> str:
+        """Add color if not in boring mode."""
+        if self.boring:
+            return text
+        return f"{color}{text}{Colors.RESET}"
+
+    @_rendered
+    def print_startup(self):
+        """Show the startup banner."""
+        if self.boring:
+            self._print(reactions.BORING_STARTUP)
+            self._print(self._colorize(random.choice(reactions.BORING_COMPLAINT), Colors.YELLOW))
+        else:
+            startup = reactions.get_random_startup(chaos=self.chaos)
+            self._print(self._colorize(startup, Colors.CYAN + Colors.BOLD))
+
+    @_rendered
+    def print_success(self, filename: str, ensemble: str = ""):
+        """Show success message."""
+        if self.boring:
+            self._print(f"✓ Downloaded: {filename}")
+        else:
+            message = reactions.get_success_message(ensemble, chaos=self.chaos)
+            self._print(f"{self._colorize('✓', Colors.GREEN)} {self._colorize(filename, Colors.BOLD)}")
+            self._print(f"   └─ {self._colorize(message, Colors.GREEN)}")
+
+    @_rendered
+    def print_duplicate(self, filename: str):
+        """Show duplicate/skip message."""
+        if self.boring:
+            self._print(f"⊘ Already exists: {filename}")
+        else:
+            message = reactions.get_duplicate_message(chaos=self.chaos)
+            self._print(f"{self._colorize('⊘', Colors.YELLOW)} {self._colorize(filename, Colors.BOLD)}")
+            self._print(f"   └─ {self._colorize(message, Colors.YELLOW)}")
+
+    @_rendered
+    def print_unchanged(self, filename: str):
+        """Show a --refresh revalidation that came back 304."""
+        if self.boring:
+            self._print(f"= Up to date: {filename}")
+        else:
+            message = reactions.get_unchanged_message(chaos=self.chaos)
+            self._print(f"{self._colorize('=', Colors.GREEN)} {self._colorize(filename, Colors.BOLD)}")
+            self._print(f"   └─ {self._colorize(message, Colors.GREEN)}")
+
+    @_rendered
+    def print_resolved(self, filename: str, name: str):
+        """Show that a program turned up under another spelling of the ensemble's name."""
+        if self.boring:
+            self._print(f"→ Found as {name!r}: {filename}")
+        else:
+            message = reactions.get_resolved_message(chaos=self.chaos)
+            self._print(f"{self._colorize('→', Colors.CYAN)} {self._colorize(f'Found as {name!r}', Colors.CYAN)}: {filename}")
+            self._print(f"   └─ {self._colorize(message, Colors.CYAN)}")
+
+    @_rendered
+    def print_cached_miss(self, filename: str):
+        """Show a known 404 that we skipped without asking the server."""
+        if self.boring:
+            self._print(f"⊘ Known missing (cached): {filename}")
+        else:
+            message = reactions.get_cached_miss_message(chaos=self.chaos)
+            self._print(f"{self._colorize('⊘', Colors.CYAN)} {self._colorize(filename, Colors.BOLD)}")
+            self._print(f"   └─ {self._colorize(message, Colors.CYAN)}")
+
+    @_rendered
+    def print_failure(self, filename: str, error_type: str = "404", status_code: Optional[int] = None):
+        """Show failure message."""
+        if self.boring:
+            status_msg = f"({status_code})" if status_code else f"({error_type})"
+            self._print(f"✗ Failed {status_msg}: {filename}")
+        else:
+            if error_type == "404" or (status_code and status_code == 404):
+                message = reactions.get_404_message(chaos=self.chaos)
+            else:
+                message = reactions.get_connection_error_message(chaos=self.chaos)
+
+            status_msg = f"{status_code}" if status_code else error_type
+            self._print(f"{self._colorize('✗', Colors.RED)} {self._colorize(f'Failed ({status_msg})', Colors.RED)}: {filename}")
+            self._print(f"   └─ {self._colorize(message, Colors.RED)}")
+
+    @_rendered
+    def print_invalid(self, filename: str, reason: str):
+        """Show a response that was thrown away because it isn't a PDF."""
+        if self.boring:
+            self._print(f"✗ Not a PDF ({reason}): {filename}")
+        else:
+            message = reactions.get_invalid_pdf_message(chaos=self.chaos)
+            self._print(f"{self._colorize('✗', Colors.RED)} {self._colorize(f'Not a PDF ({reason})', Colors.RED)}: {filename}")
+            self._print(f"   └─ {self._colorize(message, Colors.RED)}")
+
+    @_rendered
+    def print_retry(self, filename: str, attempt: int, max_attempts: int, reason: str, delay: float):
+        """Show that a job hit a transient failure and will be tried again."""
+        if self.boring:
+            self._print(f"↻ Retrying ({reason}) in {delay:.1f}s [{attempt + 1}/{max_attempts}]: {filename}")
+        else:
+            message = reactions.get_retry_message(chaos=self.chaos)
+            self._print(f"{self._colorize('↻', Colors.YELLOW)} {self._colorize(f'{reason} - retry {attempt + 1}/{max_attempts} in {delay:.1f}s', Colors.YELLOW)}: {filename}")
+            self._print(f"   └─ {self._colorize(message, Colors.YELLOW)}")
+
+    @_rendered
+    def print_circuit_open(self, cooldown: float):
+        """Show that the circuit breaker tripped and the batch is paused."""
+        if self.boring:
+            self._print(f"⚡ Server unreachable - pausing all requests for {cooldown:.0f}s, then probing")
+        else:
+            self._print(self._colorize(f"⚡ THE SERVER IS DOWN (or hiding). Everybody FREEZE for {cooldown:.0f}s, "
+                                 f"then we poke it with a stick.", Colors.RED + Colors.BOLD))
+
+    @_rendered
+    def print_circuit_closed(self):
+        """Show that the probe got through and the batch resumes."""
+        if self.boring:
+            self._print("⚡ Server reachable again - resuming")
+        else:
+            self._print(self._colorize("⚡ IT'S ALIVE!!! Resuming the hoarding.", Colors.GREEN + Colors.BOLD))
+
+    @_rendered
+    def print_budget_spent(self, spent: str, left: int):
+        """Show that --max-requests/--max-time ran out and the rest of the grid waits for next time."""
+        if self.boring:
+            self._print(f"⏱ Budget spent ({spent}) - {left} jobs not started")
+        else:
+            self._print(self._colorize(f"⏱  THAT'S ALL WE'RE ALLOWED ({spent})! {left} jobs will have to wait "
+                                       f"for next time. The likely ones went first, promise.", Colors.YELLOW + Colors.BOLD))
+
+    @_rendered
+    def print_probe_result(self, filename: str, status: Optional[int], content_length: Optional[int] = None,
+                           cached: bool = False, error: str = ""):
+        """Show one --probe result (no reactions - probes should be quick to skim)."""
+        if status == 200:
+            size = f" ({format_bytes(content_length)})" if content_length is not None else ""
+            mark, color, text = '✓', Colors.GREEN, f"Available{size}"
+        elif status is None:
+            mark, color, text = '✗', Colors.RED, f"Probe failed ({error})"
+        else:
+            mark, color, text = '⊘', Colors.YELLOW, f"Missing ({status}{', cached' if cached else ''})"
+
+        if self.boring:
+            self._print(f"{mark} {text}: {filename}")
+        else:
+            self._print(f"{self._colorize(mark, color)} {self._colorize(text, color)}: {filename}")
+
+    @_rendered
+    def print_probe_summary(self, results: List[dict], output_path: Path):
+        """Show what a --probe run found and where the matrix went."""
+        hits = [r for r in results if r['status'] == 200]
+        errors = sum(1 for r in results if r['status'] is None)
+        total_bytes = sum(r['content_length'] or 0 for r in hits)
+
+        lines = [
+            f"Available: {len(hits)} ({format_bytes(total_bytes)} total)",
+            f"Missing: {len(results) - len(hits) - errors}",
+            f"Probe errors: {errors}",
+            f"Matrix written to: {output_path}",
+        ]
+        self._print("\n" + "=" * 50)
+        self._print("PROBE SUMMARY" if self.boring else self._colorize("🔭 PROBE SUMMARY 🔭", Colors.BOLD))
+        self._print("=" * 50)
+        for line in lines:
+            self._print(line)
+        self._print("=" * 50)
+        if not self.boring and hits:
+            self._print(self._colorize(f"Run with --from-probe {output_path} to grab just the hits!", Colors.CYAN))
+
+    @_rendered
+    def print_listing_page(self, url: str, status: Optional[int], found: int = 0, unchanged: bool = False,
+                           error: str = ""):
+        """Show one archive page --discover read (no reactions - it's a crawl log)."""
+        if status == 200:
+            mark, color = '✓', Colors.GREEN
+            text = f"{found} new program{'s' if found != 1 else ''}{' (page unchanged)' if unchanged else ''}"
+        elif status is None:
+            mark, color, text = '✗', Colors.RED, f"Fetch failed ({error})"
+        else:
+            mark, color, text = '⊘', Colors.YELLOW, f"Skipped ({status})"
+
+        if self.boring:
+            self._print(f"{mark} {text}: {url}")
+        else:
+            self._print(f"{self._colorize(mark, color)} {self._colorize(text, color)}: {url}")
+
+    @_rendered
+    def print_discovery_summary(self, report: dict, output_path: Path, merged: Optional[List[str]] = None,
+                                list_path: Optional[str] = None):
+        """Show what a --discover crawl found and where the job list went."""
+        programs = report['programs']
+        lines = [
+            f"Programs found: {len(programs)} ({len({year for year, _ in programs})} years, "
+            f"{len({ensemble for _, ensemble in programs})} ensembles)",
+            f"Listing pages read: {report['pages']} ({report['unchanged']} unchanged since last time)",
+            f"Page errors: {report['errors']}",
+            f"Job list written to: {output_path}",
+        ]
+        if report['unvisited']:
+            lines.append(f"Pages left unread ({report['stopped']}): {report['unvisited']}")
+        if merged is not None:
+            lines.append(f"New ensembles added to {list_path}: {len(merged)}")
+        self._print("\n" + "=" * 50)
+        self._print("DISCOVERY SUMMARY" if self.boring else self._colorize("🕸️  DISCOVERY SUMMARY 🕸️", Colors.BOLD))
+        self._print("=" * 50)
+        for line in lines:
+            self._print(line)
+        self._print("=" * 50)
+        if not self.boring and programs:
+            self._print(self._colorize(f"Run with --from-probe {output_path} to download exactly these - "
+                                       f"no guessing, no 404s!", Colors.CYAN))
+
+    @_rendered
+    def print_rate_limit(self):
+        """Show rate limiting message with optional rant."""
+        if self.boring:
+            self._print("⏳ Rate limiting...")
+            return
+
+        message = reactions.get_rate_limit_message()
+        self._print(f"{self._colorize('⏳', Colors.CYAN)} {message}")
+
+        # Sometimes add a rant (50% chance)
+        if random.random() < 0.5 and not self.chaos:
+            rant = reactions.get_rate_limit_rant()
+            for line in rant:
+                if self._can_dawdle():
+                    time.sleep(0.25)  # Dramatic pausing (only when nobody's waiting on us)
+                self._print(f"   {self._colorize(line, Colors.CYAN)}")
+
+    @_rendered
+    def print_progress(self, current: int, total: int, year: str, ensemble: str):
+        """Show progress with occasional commentary."""
+        progress_text = f"[{current}/{total}] Processing {year} - {ensemble}"
+
+        if self.live and self._events is not None:
+            # One status line that keeps updating, instead of a new line per job
+            self._status = progress_text if self.boring else self._colorize(progress_text, Colors.BLUE + Colors.BOLD)
+        elif self.boring:
+            self._print(f"\n{progress_text}")
+            return
+        else:
+            self._print(f"\n{self._colorize(progress_text, Colors.BLUE + Colors.BOLD)}")
+
+        if self.boring:
+            return
+
+        # Check for ensemble easter eggs
+        easter_egg = reactions.get_ensemble_easter_egg(ensemble)
+        if easter_egg:
+            self._print(f"├─ {self._colorize(easter_egg, Colors.MAGENTA)}")
+
+        # Random mid-batch commentary
+        if reactions.should_show_mid_batch_comment():
+            comment = reactions.get_mid_batch_comment()
+            self._print(f"└─ {self._colorize(comment, Colors.CYAN)}")
+
+    @_rendered
+    def print_summary(self, stats: Stats):
+        """Show the final summary with ASCII art glory."""
+        if self.boring:
+            self._print("\n" + "="*50)
+            self._print("SUMMARY")
+            self._print("="*50)
+            self._print(f"Successfully Downloaded: {stats.success}")
+            self._print(f"Already Existed: {stats.skipped}")
+            self._print(f"Failed: {stats.failed}")
+            if stats.cached_misses:
+                self._print(f"Known Missing (cached): {stats.cached_misses}")
+            if stats.retries:
+                self._print(f"Retries: {stats.retries}")
+            if stats.invalid:
+                self._print(f"Invalid (not a PDF): {stats.invalid}")
+            if stats.resolved:
+                self._print(f"Found Under Another Name: {stats.resolved}")
+            if stats.deferred:
+                self._print(f"Not Started (budget): {stats.deferred}")
+            self._print(f"Output Directory: /{OUTPUT_DIR}/")
+            self._print("="*50)
+            return
+
+        # THE GLORIOUS SUMMARY
+        header = reactions.get_summary_header()
+        footer = reactions.get_summary_footer()
+        outro = reactions.get_summary_outro()
+
+        self._print("\n")
+        self._print(self._colorize("╔═════════════════════════════════════════════════╗", Colors.BOLD))
+        self._print(self._colorize(f"║   {header:^44} ║", Colors.BOLD))
+        self._print(self._colorize("╠═════════════════════════════════════════════════╣", Colors.BOLD))
+        self._print(f"║  {self._colorize('✓', Colors.GREEN)} {self._colorize(f'Successfully Yoinked: {stats.success}', Colors.GREEN):54} ║")
+        self._print(f"║  {self._colorize('⊘', Colors.YELLOW)} {self._colorize(f'Already Had (boring): {stats.skipped}', Colors.YELLOW):54} ║")
+        self._print(f"║  {self._colorize('✗', Colors.RED)} {self._colorize(f'Failures (welp): {stats.failed}', Colors.RED):54} ║")
+        if stats.cached_misses:
+            self._print(f"║  {self._colorize('⊘', Colors.CYAN)} {self._colorize(f'Known 404s (not re-asked): {stats.cached_misses}', Colors.CYAN):54} ║")
+        if stats.retries:
+            self._print(f"║  {self._colorize('↻', Colors.YELLOW)} {self._colorize(f'Retries (persistence!): {stats.retries}', Colors.YELLOW):54} ║")
+        if stats.invalid:
+            self._print(f"║  {self._colorize('✗', Colors.RED)} {self._colorize(f'Fake PDFs (tossed): {stats.invalid}', Colors.RED):54} ║")
+        if stats.resolved:
+            self._print(f"║  {self._colorize('→', Colors.CYAN)} {self._colorize(f'Unmasked Aliases: {stats.resolved}', Colors.CYAN):54} ║")
+        if stats.deferred:
+            self._print(f"║  {self._colorize('⏱', Colors.YELLOW)} {self._colorize(f'Saved For Later (budget): {stats.deferred}', Colors.YELLOW):54} ║")
+        self._print("║                                                 ║")
+        self._print(f"║  🎷 {self._colorize(f'YOUR HOARD: /{OUTPUT_DIR}/', Colors.CYAN):46} ║")
+        self._print("║                                                 ║")
+        self._print(f"║  {self._colorize(footer, Colors.MAGENTA):50} ║")
+        self._print(self._colorize("╚═════════════════════════════════════════════════╝", Colors.BOLD))
+        self._print(f"\n{self._colorize(outro, Colors.CYAN)}")
+
+        # Chaos mode gets EXTRA celebration
+        if self.chaos and stats.success > 0:
+            self._print(self._colorize("\n🎉🎊🎉 CHAOS REIGNS SUPREME!!! 🎉🎊🎉", Colors.MAGENTA + Colors.BOLD))
+            self._print(self._colorize("WE'RE UNSTOPPABLE!!! NOTHING CAN STOP THE PDF HOARD!!!", Colors.MAGENTA))
+
+# ============================================================================
+# CORE SCRAPER FUNCTIONS
+# ============================================================================
+
+def validators_path(filepath: Path) -> Path:
+    """Where the ETag/Last-Modified sidecar for a downloaded PDF lives."""
+    return filepath.with_name(f".{filepath.name}.validators.json")
+
+def save_validators(filepath: Path, response: requests.Response):
+    """Remember the response's cache validators so --refresh can revalidate later."""
+    validators = {key: response.headers[key] for key in ('ETag', 'Last-Modified') if key in response.headers}
+    sidecar = validators_path(filepath)
+    if not validators:
+        # Stale validators from an older copy would be worse than none
+        try:
+            sidecar.unlink()
+        except FileNotFoundError:
+            pass
+        return
+    with open(sidecar, 'w') as f:
+        json.dump(validators, f)
+
+def conditional_headers(filepath: Path) -> dict:
+    """
+    Build If-None-Match/If-Modified-Since headers for an existing download.
+
+    Falls back to the file's mtime when no validators were saved (files from
+    before --refresh existed), which servers treat like wget -N would.
+    """
+    try:
+        with open(validators_path(filepath), 'r') as f:
+            validators = json.load(f)
+    except (FileNotFoundError, ValueError):
+        validators = {}
+
+    headers = {}
+    if 'ETag' in validators:
+        headers['If-None-Match'] = validators['ETag']
+    if 'Last-Modified' in validators:
+        headers['If-Modified-Since'] = validators['Last-Modified']
+    if not headers:
+        headers['If-Modified-Since'] = formatdate(filepath.stat().st_mtime, usegmt=True)
+    return headers
+
+def partial_path(filepath: Path) -> Path:
+    """Where an in-progress (and resumable) download of `filepath` lives."""
+    return filepath.with_name(f"{filepath.name}.part")
+
+def discard_partial(filepath: Path):
+    """Throw away a partial download and its validators."""
+    partial = partial_path(filepath)
+    for leftover in (partial, validators_path(partial)):
+        try:
+            leftover.unlink()
+        except FileNotFoundError:
+            pass
+
+def resume_headers(filepath: Path) -> dict:
+    """
+    Build Range/If-Range headers to continue a partial download, or {} if
+    there's nothing (safely) resumable.
+
+    If-Range makes the server send the whole file instead of a range when the
+    file changed since the partial was started, so we never splice two
+    different PDFs together. Weak ETags aren't allowed there, and without any
+    validator we can't prove the partial is still good, so start over.
+    """
+    partial = partial_path(filepath)
+    try:
+        size = partial.stat().st_size
+    except FileNotFoundError:
+        return {}
+    try:
+        with open(validators_path(partial), 'r') as f:
+            validators = json.load(f)
+    except (FileNotFoundError, ValueError):
+        discard_partial(filepath)
+        return {}
+
+    etag = validators.get('ETag', '')
+    validator = etag if etag and not etag.startswith('W/') else validators.get('Last-Modified')
+    if size == 0 or not validator:
+        discard_partial(filepath)
+        return {}
+    return {'Range': f'bytes={size}-', 'If-Range': validator}
+
+def content_range_start(response: requests.Response) -> Optional[int]:
+    """First byte offset from a 206's Content-Range ('bytes 100-199/200' -> 100)."""
+    value = response.headers.get('Content-Range', '')
+    try:
+        unit, _, span = value.partition(' ')
+        return int(span.split('-', 1)[0]) if unit == 'bytes' else None
+    except ValueError:
+        return None
+
+class InvalidPDF(Exception):
+    """A 200/206 whose body isn't a (complete) PDF - an HTML error page, say."""
+
+def check_content_type(response: requests.Response):
+    """Refuse a response whose Content-Type says it isn't a PDF (a missing one is fine)."""
+    content_type = response.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+    if content_type and content_type not in PDF_CONTENT_TYPES:
+        raise InvalidPDF(f"Content-Type {content_type}")
+
+def expected_length(response: requests.Response) -> Optional[int]:
+    """Body bytes the server promised, if we can check that (not after decompression)."""
+    if response.headers.get('Content-Encoding', 'identity').lower() != 'identity':
+        return None
+    try:
+        return int(response.headers['Content-Length'])
+    except (KeyError, ValueError):
+        return None
+
+def looks_like_pdf(filepath: Path) -> bool:
+    """Cheap check that a file on disk at least starts like a PDF."""
+    try:
+        with open(filepath, 'rb') as f:
+            return PDF_MAGIC in f.read(PDF_SNIFF_BYTES)
+    except OSError:
+        return False
+
+def stream_to_file(response: requests.Response, filepath: Path, chunk_size: int = CHUNK_SIZE,
+                   resume_from: int = 0, timing: Optional[JobTiming] = None,
+                   bandwidth: Optional[BandwidthLimiter] = None) -> Tuple[int, str]:
+    """
+    Stream a response body to `filepath` without holding it all in memory.
+
+    The body goes to `{filename}.part` next to the destination and is only
+    renamed into place once every byte is on disk, so an interrupted download
+    never leaves a truncated PDF that looks "already downloaded". If the
+    transfer dies, the .part file stays behind for the next run to resume.
+
+    The body is checked on the way through: a non-PDF Content-Type or a head
+    without %PDF- aborts before anything is written (not even the .part file
+    or its year directory), and a body that's longer than its Content-Length
+    or has no %%EOF near the end is never renamed into place. Both raise
+    InvalidPDF. A body cut short of its Content-Length
+    raises ChunkedEncodingError like any other dropped transfer, so it can be
+    resumed.
+
+    Args:
+        resume_from: Offset the response body starts at (a 206 continuing the
+            existing .part file); 0 starts the file over
+        timing: Gets the network-read, throttle and disk-write time and bytes added to it
+        bandwidth: Shared byte-rate cap; each chunk waits its turn under it
+
+    Returns:
+        (size, sha256) of the finished file
+    """
+    check_content_type(response)
+    partial = partial_path(filepath)
+
+    def start_partial():
+        # Only a body that passed the sniff gets a .part file (and a year directory)
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        # Remember what we're downloading so a resume can check it's the same file
+        save_validators(partial, response)
+        return open(partial, 'wb')
+
+    digest = hashlib.sha256()
+    size = resume_from
+    head = b""  # held back until we've seen enough to know it's a PDF
+    tail = b""  # the last PDF_SNIFF_BYTES written, for the %%EOF check
+    disk_time = 0.0
+    throttled = 0.0
+    if bandwidth is not None:
+        chunk_size = bandwidth.read_size(chunk_size)
+    started = time.perf_counter()
+    f = None
+    try:
+        try:
+            if resume_from:
+                f = open(partial, 'r+b')
+                # Hash what we already have, then keep hashing as the rest streams in
+                remaining = resume_from
+                while remaining:
+                    chunk = f.read(min(chunk_size, remaining))
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tail = (tail + chunk)[-PDF_SNIFF_BYTES:]
+                    remaining -= len(chunk)
+                f.seek(resume_from)
+                f.truncate()
+                disk_time += time.perf_counter() - started
+            sniffing = not resume_from  # A resumed .part passed this check when it was started
+
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if not chunk:
+                    continue
+                if bandwidth is not None:
+                    throttled += bandwidth.consume(len(chunk))
+                if sniffing:
+                    head += chunk
+                    if len(head) < PDF_SNIFF_BYTES:
+                        continue
+                    if PDF_MAGIC not in head[:PDF_SNIFF_BYTES]:
+                        raise InvalidPDF("no %PDF- header")
+                    chunk, head, sniffing = head, b"", False
+                    f = start_partial()
+                write_start = time.perf_counter()
+                f.write(chunk)
+                disk_time += time.perf_counter() - write_start
+                digest.update(chunk)
+                tail = (tail + chunk)[-PDF_SNIFF_BYTES:]
+                size += len(chunk)
+
+            if sniffing:
+                # The whole body was shorter than the sniff window
+                if PDF_MAGIC not in head:
+                    raise InvalidPDF("no %PDF- header")
+                f = start_partial()
+                f.write(head)
+                digest.update(head)
+                tail = (tail + head)[-PDF_SNIFF_BYTES:]
+                size += len(head)
+
+            expected = expected_length(response)
+            if expected is not None and size - resume_from < expected:
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"body ended after {size - resume_from} of {expected} bytes")
+            if expected is not None and size - resume_from > expected:
+                raise InvalidPDF(f"{size - resume_from} bytes, Content-Length said {expected}")
+            if PDF_EOF not in tail:
+                raise InvalidPDF("no %%EOF trailer")
+
+            sync_start = time.perf_counter()
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            if f is not None:
+                f.close()
+
+        os.replace(partial, filepath)
+        try:
+            validators_path(partial).unlink()
+        except FileNotFoundError:
+            pass
+        disk_time += time.perf_counter() - sync_start
+    finally:
+        if timing is not None:
+            timing.disk_write += disk_time
+            timing.bandwidth_wait += throttled
+            timing.transfer += max(0.0, time.perf_counter() - started - disk_time - throttled)
+            timing.bytes += size - resume_from
+    return size, digest.hexdigest()
+
+def download_program(year: int, ensemble: str, ui: ScraperUI, stats: Stats,
+                     transport: Optional[Transport] = None,
+                     negative_cache: Optional[NegativeCache] = None,
+                     refresh: bool = False,
+                     manifest: Optional[Manifest] = None,
+                     metrics: Optional[Metrics] = None,
+                     store: Optional[BlobStore] = None,
+                     extractor: Optional[extraction.ExtractionPipeline] = None,
+                     resolver: Optional[NameResolver] = None,
+                     timing: Optional[JobTiming] = None,
+                     links: Optional[DiscoveredLinks] = None) -> bool:
+    """
+    Download a single concert program PDF.
+
+    Args:
+        year: The year (e.g., 2009)
+        ensemble: The ensemble name (e.g., "Buchholz" or "USAF")
+        ui: The UI handler
+        stats: Statistics tracker
+        transport: Pooled HTTP transport (defaults to a shared, unthrottled one)
+        negative_cache: Known 404s to skip without a request, updated with new ones
+        refresh: Revalidate existing files and re-download them only if changed
+        manifest: Download manifest to record the finished file in
+        metrics: Gets this job's per-phase timing
+        store: Blob store to deduplicate the finished file into
+        extractor: Text-extraction pipeline to hand the finished file to
+        resolver: Tries other spellings of the ensemble's name when the program 404s
+        timing: Filled in with this job's timing (see JobTiming.outcome for what happened)
+        links: URLs --discover found, tried before any URL made from BASE_URL
+
+    Returns:
+        True if successful, False otherwise
+    """
+    if timing is None:
+        timing = JobTiming()
+    start = time.perf_counter()
+    ok = False
+    try:
+        ok = _download_program(year, ensemble, ui, stats, transport, negative_cache, refresh, manifest,
+                               store, extractor, resolver, timing, links)
+        return ok
+    finally:
+        timing.total = time.perf_counter() - start
+        if metrics is not None:
+            metrics.observe_job(timing, ok)
+
+def _download_program(year: int, ensemble: str, ui: ScraperUI, stats: Stats,
+                      transport: Optional[Transport], negative_cache: Optional[NegativeCache],
+                      refresh: bool, manifest: Optional[Manifest], store: Optional[BlobStore],
+                      extractor: Optional[extraction.ExtractionPipeline], resolver: Optional[NameResolver],
+                      timing: JobTiming, links: Optional[DiscoveredLinks]) -> bool:
+    """download_program without the timing bookkeeping."""
+    # Build filename (always the list's name, whatever the URL ends up using)
+    year_dir = Path(OUTPUT_DIR) / str(year)
+    filename = program_filename(year, ensemble)
+    filepath = year_dir / filename
+
+    # Check if already downloaded (--refresh asks the server instead). A file
+    # that isn't a PDF at all (an error page saved by an older version) doesn't count.
+    headers = {}
+    others = []  # Other spellings to search if the first one 404s
+    revalidating = filepath.exists() and looks_like_pdf(filepath)
+    link = links.get(year, ensemble) if links is not None else None
+    if revalidating:
+        if not refresh:
+            ui.print_duplicate(filename)
+            stats.add_skip()
+            return False
+        headers = conditional_headers(filepath)
+        # Revalidate wherever we found it last time
+        name = (resolver.resolved(year, ensemble) if resolver is not None else None) or ensemble
+    elif link is not None:
+        # --discover saw it linked, so no guess (or a guess's cached 404) gets in the way
+        name = ensemble
+    else:
+        # Known 404 under every name worth trying? Don't even ask
+        names = candidate_names(year, ensemble, resolver, negative_cache)
+        if not names:
+            ui.print_cached_miss(filename)
+            stats.add_cached_miss()
+            timing.cached_miss = True
+            return False
+        name, others = names[0], names[1:]
+    url = timing.url = link or BASE_URL.format(year=year, ensemble=quote(name))
+
+    if transport is None:
+        transport = get_default_transport()
+
+    policy = transport.retry_policy
+    conditional = headers
+    attempt = 0
+    while True:
+        attempt += 1
+        # Pick up where a previous attempt (this run or an earlier one) left off
+        headers = conditional or resume_headers(filepath)
+        status_code = None
+
+        # Download the PDF
+        try:
+            response = transport.get(url, stream=True, headers=headers, timing=timing)
+            if response.status_code == 416 and 'Range' in headers:
+                # Our partial doesn't fit the server's file any more - start over
+                transport.discard(response)
+                response.close()
+                discard_partial(filepath)
+                headers = {}
+                response = transport.get(url, stream=True, timing=timing)
+
+            with response:
+                if response.status_code == 304:
+                    # Revalidated - our copy is current
+                    transport.discard(response)
+                    ui.print_unchanged(filename)
+                    stats.add_skip()
+                    return False
+                elif response.status_code in (200, 206):
+                    # Success! Stream it to disk (a 206 continues our .part file;
+                    # a 200 means the server ignored the range, so start fresh)
+                    resume_from = 0
+                    if response.status_code == 206:
+                        resume_from = partial_path(filepath).stat().st_size
+                        if content_range_start(response) != resume_from:
+                            discard_partial(filepath)
+                            raise ValueError(f"unexpected Content-Range {response.headers.get('Content-Range')!r}")
+                    size, sha256 = stream_to_file(response, filepath, chunk_size=transport.chunk_size,
+                                                  resume_from=resume_from, timing=timing,
+                                                  bandwidth=transport.bandwidth)
+                    save_validators(filepath, response)
+                    if store is not None:
+                        try:
+                            store.adopt(filepath, sha256)
+                        except OSError:
+                            pass  # Dedupe is best effort - the file is in place either way
+                    if manifest is not None:
+                        manifest.record(year, ensemble, filepath, url, size, sha256, status=response.status_code,
+                                        etag=response.headers.get('ETag'),
+                                        last_modified=response.headers.get('Last-Modified'))
+                    if negative_cache is not None:
+                        negative_cache.forget(year, name)
+                    if resolver is not None:
+                        resolver.remember(year, ensemble, name)
+                        if name != ensemble:
+                            stats.add_resolved()
+                    if extractor is not None:
+                        extractor.submit(year, ensemble, filepath, sha256)  # Blocks if extraction is behind
+                    ui.print_success(filename, ensemble)
+                    stats.add_success()
+                    return True
+                elif response.status_code == 404:
+                    # File not found (a refreshed file that vanished upstream stays on disk)
+                    transport.discard(response)
+                    if link is not None:
+                        # A dead link - forget it and try the URL we'd have guessed instead
+                        links.forget(year, ensemble)
+                        link = None
+                        names = [name] if revalidating else candidate_names(year, ensemble, resolver, negative_cache)
+                        if names:
+                            name, others = names[0], names[1:]
+                            url = timing.url = BASE_URL.format(year=year, ensemble=quote(name))
+                            attempt = 0
+                            continue
+                    elif not revalidating:
+                        if negative_cache is not None:
+                            negative_cache.record_miss(year, name, variant=name != ensemble)
+                        # Maybe it's there under another name - HEAD the others, then fetch the hit
+                        found = resolver.search(year, ensemble, others, transport, negative_cache) if others else None
+                        others = []
+                        if found is not None:
+                            name = found[0]
+                            url = timing.url = BASE_URL.format(year=year, ensemble=quote(name))
+                            if name != ensemble:
+                                ui.print_resolved(filename, name)
+                            attempt = 0
+                            continue
+                    ui.print_failure(filename, error_type="404", status_code=404)
+                    stats.add_failure()
+                    return False
+                elif policy.is_retryable_status(response.status_code):
+                    # Server's having a moment - maybe try again below
+                    transport.discard(response)
+                    status_code = response.status_code
+                    error_type = f"HTTP {status_code}"
+                else:
+                    # Other HTTP error
+                    transport.discard(response)
+                    ui.print_failure(filename, error_type=f"HTTP {response.status_code}", status_code=response.status_code)
+                    stats.add_failure()
+                    return False
+
+        except InvalidPDF as e:
+            # Never saved, never resumed - closing the response drops the rest of the body
+            discard_partial(filepath)
+            timing.invalid = True
+            ui.print_invalid(filename, str(e))
+            stats.add_invalid()
+            return False
+        except requests.exceptions.Timeout:
+            error_type = "TIMEOUT"
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
+            # A dropped transfer leaves its .part file behind, so a retry only fetches the rest
+            error_type = "CONNECTION ERROR"
+        except Exception as e:
+            ui.print_failure(filename, error_type=f"ERROR: {str(e)}")
+            stats.add_failure()
+            return False
+
+        # Only transient failures get this far
+        if attempt >= policy.max_attempts:
+            ui.print_failure(filename, error_type=error_type, status_code=status_code)
+            stats.add_failure()
+            return False
+        delay = policy.delay(attempt)
+        ui.print_retry(filename, attempt, policy.max_attempts, error_type, delay)
+        stats.add_retry()
+        time.sleep(delay)
+
+def load_ensemble_list(filepath: str) -> List[str]:
+    """Load ensemble names from a file (one per line)."""
+    ensembles = []
+    with open(filepath, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):  # Skip empty lines and comments
+                ensembles.append(line)
+    return ensembles
+
+def parse_byte_rate(value: str) -> float:
+    """'500K' -> 512000.0 bytes/second ('2M', '1.5MB', '800k/s' and plain byte counts work too)."""
+    text = value.strip().upper().replace('/S', '').rstrip('B')
+    multiplier = 1
+    if text and text[-1] in 'KMG':
+        multiplier = 1024 ** ('KMG'.index(text[-1]) + 1)
+        text = text[:-1]
+    return float(text) * multiplier
+
+def parse_year_range(year_range: str) -> List[int]:
+    """Parse a year range like '2015-2023' into a list of years."""
+    if '-' in year_range:
+        start, end = year_range.split('-')
+        return list(range(int(start), int(end) + 1))
+    else:
+        return [int(year_range)]
+
+def format_bytes(size: Optional[int]) -> str:
+    """Human-friendly byte count: 1536 -> '1.5 KB'."""
+    if size is None:
+        return "unknown size"
+    value = float(size)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024 or unit == 'GB':
+            return f"{value:.0f} {unit}" if unit == 'B' else f"{value:.1f} {unit}"
+        value /= 1024
+
+def probe_url(url: str, transport: Transport) -> Tuple[int, Optional[int]]:
+    """
+    (status, Content-Length) for a URL without downloading it.
+
+    Timeouts, dropped connections and retryable statuses (429, 5xx) are
+    retried like downloads are, per the transport's retry policy; a
+    retryable status that outlasts the retries is returned as it is.
+    Raises requests' exceptions if the probe itself still fails.
+    """
+    policy = transport.retry_policy
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            status, length = _probe_url(url, transport)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            if attempt >= policy.max_attempts:
+                raise
+            time.sleep(policy.delay(attempt))
+            continue
+        if policy.is_retryable_status(status) and attempt < policy.max_attempts:
+            time.sleep(policy.delay(attempt))
+            continue
+        return status, length
+
+def _probe_url(url: str, transport: Transport) -> Tuple[int, Optional[int]]:
+    """probe_url without the retries: one HEAD, or a one-byte ranged GET for servers that don't do HEAD."""
+    response = transport.head(url)
+    status = response.status_code
+    length = response.headers.get('Content-Length')
+    if status in (405, 501):
+        # No HEAD here - ask for a single byte instead
+        with transport.get(url, stream=True, headers={'Range': 'bytes=0-0'}) as response:
+            transport.discard(response)
+            status = response.status_code
+            length = response.headers.get('Content-Length')
+            if status == 206:
+                status = 200
+                length = response.headers.get('Content-Range', '').rpartition('/')[2]
+    if status == 200 and length and length.isdigit():
+        return status, int(length)
+    return status, None
+
+def probe_program(year: int, ensemble: str, ui: ScraperUI, transport: Optional[Transport] = None,
+                  negative_cache: Optional[NegativeCache] = None,
+                  resolver: Optional[NameResolver] = None) -> dict:
+    """
+    Check whether a program exists without downloading it.
+
+    With a resolver, a 404 goes on to try the ensemble's other spellings.
+
+    Returns:
+        {'year', 'ensemble', 'url', 'status', 'content_length', 'cached'}, plus
+        'error' when the probe itself failed (status is then None)
+    """
+    filename = program_filename(year, ensemble)
+    names = candidate_names(year, ensemble, resolver, negative_cache)
+    name = names[0] if names else ensemble
+    url = BASE_URL.format(year=year, ensemble=quote(name))
+    result = {'year': year, 'ensemble': ensemble, 'url': url,
+              'status': None, 'content_length': None, 'cached': False}
+
+    if not names:
+        result.update(status=404, cached=True)
+        ui.print_probe_result(filename, 404, cached=True)
+        return result
+
+    if transport is None:
+        transport = get_default_transport()
+
+    try:
+        result['status'], result['content_length'] = probe_url(url, transport)
+    except requests.exceptions.RequestException as e:
+        result['error'] = type(e).__name__
+    if result['status'] is not None and transport.retry_policy.is_retryable_status(result['status']):
+        # Still a 429/5xx after the retries: no verdict, so an error cell - not "missing"
+        result.update(status=None, error=f"HTTP {result['status']}")
+
+    if negative_cache is not None:
+        if result['status'] == 404:
+            negative_cache.record_miss(year, name, variant=name != ensemble)
+        elif result['status'] == 200:
+            negative_cache.forget(year, name)
+
+    if resolver is not None:
+        if result['status'] == 200:
+            resolver.remember(year, ensemble, name)
+        elif result['status'] == 404 and len(names) > 1:
+            found = resolver.search(year, ensemble, names[1:], transport, negative_cache)
+            if found is not None:
+                name, length = found
+                result.update(url=BASE_URL.format(year=year, ensemble=quote(name)), status=200, content_length=length)
+                if name != ensemble:
+                    ui.print_resolved(filename, name)
+
+    ui.print_probe_result(filename, result['status'], result['content_length'], error=result.get('error', ''))
+    return result
+
+def write_probe_matrix(results: List[dict], output_path: Path):
+    """
+    Write probe results as a year x ensemble availability matrix.
+
+    `.json` gets the full detail (status and Content-Length per cell); anything
+    else gets a CSV with one row per ensemble, one column per year, and the
+    HTTP status in each cell (blank if the probe itself failed).
+    """
+    years = sorted({r['year'] for r in results})
+    ensembles = list(dict.fromkeys(r['ensemble'] for r in results))
+    cells = {(r['year'], r['ensemble']): r for r in results}
+
+    output_path = Path(output_path)
+    if output_path.parent != Path('.'):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if output_path.suffix.lower() == '.json':
+        matrix = {
+            ensemble: {
+                str(year): {'status': cells[(year, ensemble)]['status'],
+                            'content_length': cells[(year, ensemble)]['content_length']}
+                for year in years if (year, ensemble) in cells
+            }
+            for ensemble in ensembles
+        }
+        with open(output_path, 'w') as f:
+            json.dump({'years': years, 'ensembles': ensembles, 'matrix': matrix}, f, indent=2)
+        return
+
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ensemble'] + years)
+        for ensemble in ensembles:
+            row = [ensemble]
+            for year in years:
+                cell = cells.get((year, ensemble))
+                row.append('' if cell is None or cell['status'] is None else cell['status'])
+            writer.writerow(row)
+
+def load_probe_hits(probe_path: str) -> List[Tuple[int, str]]:
+    """Read a --probe matrix (CSV or JSON) back as the (year, ensemble) jobs that were 200s."""
+    path = Path(probe_path)
+    hits = []
+    if path.suffix.lower() == '.json':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        for ensemble, row in data['matrix'].items():
+            for year, cell in row.items():
+                if cell.get('status') == 200:
+                    hits.append((int(year), ensemble))
+    else:
+        with open(path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            years = [int(year) for year in next(reader)[1:]]
+            for row in reader:
+                for year, status in zip(years, row[1:]):
+                    if status == '200':
+                        hits.append((year, row[0]))
+    return sorted(hits)
+
+def run_pool(jobs: Iterable[Tuple[int, str]], handler, ui: ScraperUI, workers: int = DEFAULT_WORKERS,
+             budget: Optional[Budget] = None) -> int:
+    """
+    Run handler(current, total, job) for every job (a list, or a JobScheduler
+    that picks the order as it goes).
+
+    With one worker the jobs run in order, exactly like they always have. With
+    more, they run on a thread pool so slow responses overlap; the transport's
+    shared limiter keeps the overall request rate where it was. Once `budget`
+    is spent no new jobs start.
+
+    Returns:
+        How many jobs were started
+    """
+    total = len(jobs)
+    counter_lock = threading.Lock()
+    counter = [0]
+
+    def run(job: Tuple[int, str]):
+        with counter_lock:
+            counter[0] += 1
+            current = counter[0]
+        handler(current, total, job)
+
+    def out_of_budget(started: int) -> bool:
+        spent = budget.spent() if budget is not None else None
+        if spent is not None:
+            ui.print_budget_spent(spent, total - started)
+        return spent is not None
+
+    started = 0
+    if workers <= 1:
+        for index, job in enumerate(jobs):
+            if out_of_budget(started):
+                break
+            started += 1
+            run(job)
+            if index < total - 1:  # Don't grumble after the last one
+                ui.print_rate_limit()
+        return started
+
+    # Only keep a couple of jobs per worker in flight so Ctrl+C doesn't have
+    # to wait for the whole grid to drain (and so the scheduler hears how the
+    # last few went before it picks the next one)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        try:
+            for job in jobs:
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()  # A job that blew up stops the run, just like it would serially
+                if out_of_budget(started):
+                    break
+                started += 1
+                pending.add(pool.submit(run, job))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+        except BaseException:
+            for future in pending:
+                future.cancel()  # Let the ones already running finish, start no more
+            raise
+    return started
+
+def run_probes(jobs: Iterable[Tuple[int, str]], ui: ScraperUI, transport: Transport,
+               workers: int = DEFAULT_WORKERS, negative_cache: Optional[NegativeCache] = None,
+               resolver: Optional[NameResolver] = None, budget: Optional[Budget] = None) -> List[dict]:
+    """Probe every job on the worker pool; results come back in grid order (minus any the budget cut off)."""
+    results = {}
+    scheduler = jobs if isinstance(jobs, JobScheduler) else None
+
+    def handle(current: int, total: int, job: Tuple[int, str]):
+        year, ensemble = job
+        ui.print_progress(current, total, str(year), ensemble)
+        results[job] = probe_program(year, ensemble, ui, transport=transport, negative_cache=negative_cache,
+                                     resolver=resolver)
+        if scheduler is not None:
+            scheduler.record(job, results[job]['status'] == 200)
+
+    run_pool(jobs, handle, ui, workers=workers, budget=budget)
+    grid = scheduler.grid if scheduler is not None else jobs
+    return [results[job] for job in grid if job in results]
+
+def run_jobs(jobs: Iterable[Tuple[int, str]], ui: ScraperUI, stats: Stats,
+             transport: Transport, workers: int = DEFAULT_WORKERS,
+             negative_cache: Optional[NegativeCache] = None, refresh: bool = False,
+             manifest: Optional[Manifest] = None, metrics: Optional[Metrics] = None,
+             store: Optional[BlobStore] = None, extractor: Optional[extraction.ExtractionPipeline] = None,
+             resolver: Optional[NameResolver] = None, budget: Optional[Budget] = None,
+             journal: Optional[Journal] = None, events: Optional[EventLog] = None,
+             in_flight: Optional['InFlightJobs'] = None, links: Optional[DiscoveredLinks] = None):
+    """
+    Run every (year, ensemble) job through download_program on the worker
+    pool, telling a JobScheduler or QueueLease how each one went and
+    journaling (and, for --output jsonl, reporting) each outcome. Jobs the
+    budget cuts off count as deferred (a queue just keeps them). With
+    `in_flight` (the daemon's), a job another batch is running waits for it.
+    """
+    scheduler = jobs if isinstance(jobs, JobScheduler) else None
+    lease = jobs if isinstance(jobs, QueueLease) else None
+
+    def handle(current: int, total: int, job: Tuple[int, str]):
+        year, ensemble = job
+        ui.print_progress(current, total, str(year), ensemble)
+        timing = JobTiming()
+        job_stats = Stats()  # This job's share, so the journal can restore the totals exactly
+        with in_flight.claim(job) if in_flight is not None else nullcontext():
+            ok = download_program(year, ensemble, ui, job_stats, transport=transport,
+                                  negative_cache=negative_cache, refresh=refresh, manifest=manifest, metrics=metrics,
+                                  store=store, extractor=extractor, resolver=resolver, timing=timing,
+                                  links=links)
+        counts = job_stats.to_dict()
+        stats.merge(counts)
+        outcome = timing.outcome(ok)
+        filepath = Path(OUTPUT_DIR) / str(year) / program_filename(year, ensemble)
+        if journal is not None:
+            journal.record(job, outcome, counts)
+        if scheduler is not None:
+            # A skip or a 304 still means the program exists
+            scheduler.record(job, ok or filepath.exists())
+        if lease is not None:
+            lease.record(job, outcome)
+        if events is not None:
+            events.job(job, outcome, timing, filepath if ok or filepath.exists() else None)
+
+    started = run_pool(jobs, handle, ui, workers=workers, budget=budget)
+    if lease is None:
+        stats.add_deferred(len(jobs) - started)
+
+# ============================================================================
+# ARCHIVE DISCOVERY
+# ============================================================================
+
+# Links that can't be listing pages, so --discover never fetches them
+NOT_A_PAGE = re.compile(r"\.(?:pdf|jpe?g|png|gif|svg|webp|ico|css|js|zip|docx?|xlsx?|pptx?|mp3|mp4|mov)$",
+                        re.IGNORECASE)
+
+def program_link_pattern(base_url: Optional[str] = None):
+    """
+    A regex for program PDF links, made from the file name part of BASE_URL:
+    '{year}_{ensemble}_Concert.pdf' -> (?P<year>\\d{4})_(?P<ensemble>[^/]+?)_Concert\\.pdf$
+
+    Only the file name has to match, so links through another path or host
+    (a CDN, an older site layout) still count.
+    """
+    template = re.escape((base_url or BASE_URL).rsplit('/', 1)[-1])
+    year, ensemble = re.escape('{year}'), re.escape('{ensemble}')
+    template = template.replace(year, r'(?P<year>\d{4})', 1).replace(year, r'(?P=year)')
+    template = template.replace(ensemble, r'(?P<ensemble>[^/]+?)', 1)
+    return re.compile(template + '$')
+
+class LinkParser(HTMLParser):
+    """
+    Collects the link targets of an HTML page as it is fed, a chunk at a
+    time, so a listing page is parsed while it downloads and never has to
+    be held in memory whole. Links come out absolute (honouring <base>).
+    """
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.links = []
+
+    def handle_starttag(self, tag: str, attrs):
+        if tag not in ('a', 'area', 'base'):
+            return
+        href = dict(attrs).get('href')
+        if not href:
+            return
+        if tag == 'base':
+            self.base_url = urljoin(self.base_url, href.strip())
+        else:
+            self.links.append(urljoin(self.base_url, href.strip()))
+
+def listing_cache_path(cache_dir: Path, url: str) -> Path:
+    """Where the cached copy of an archive page lives."""
+    return cache_dir / f"{hashlib.sha1(url.encode()).hexdigest()}.html"
+
+def response_encoding(response: requests.Response) -> str:
+    """The charset a page declares in its Content-Type, or UTF-8."""
+    _, _, charset = response.headers.get('Content-Type', '').partition('charset=')
+    charset = charset.split(';')[0].strip(' "\'')
+    try:
+        return codecs.lookup(charset).name if charset else 'utf-8'
+    except LookupError:
+        return 'utf-8'
+
+def fetch_listing(url: str, transport: Transport, cache_dir: Path) -> Tuple[int, bool, List[str]]:
+    """
+    Fetch one archive page and return the links on it.
+
+    A page fetched before is revalidated (If-None-Match/If-Modified-Since);
+    on a 304 the links come from the cached copy instead. A fresh page is
+    parsed as it streams in and saved (as UTF-8) alongside its validators.
+    Transient failures are retried like downloads are.
+
+    Returns:
+        (status, unchanged, links) - status is the server's (200 for a 304),
+        and pages that aren't HTML come back with no links
+    Raises:
+        requests' exceptions once the retries run out
+    """
+    cache_path = listing_cache_path(cache_dir, url)
+    policy = transport.retry_policy
+    attempt = 0
+    while True:
+        attempt += 1
+        headers = conditional_headers(cache_path) if cache_path.exists() else {}
+        try:
+            with transport.get(url, stream=True, headers=headers) as response:
+                status = response.status_code
+                if status == 304 and headers:
+                    transport.discard(response)
+                    parser = LinkParser(response.url)
+                    with open(cache_path, 'r', encoding='utf-8') as f:
+                        for text in iter(lambda: f.read(CHUNK_SIZE), ''):
+                            parser.feed(text)
+                    parser.close()
+                    return 200, True, parser.links
+
+                if policy.is_retryable_status(status) and attempt < policy.max_attempts:
+                    transport.discard(response)
+                    time.sleep(policy.delay(attempt))
+                    continue
+                if status != 200 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+                    transport.discard(response)
+                    return status, False, []
+
+                parser = LinkParser(response.url)
+                decoder = codecs.getincrementaldecoder(response_encoding(response))(errors='replace')
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                part = partial_path(cache_path)
+                try:
+                    with open(part, 'w', encoding='utf-8') as out:
+                        for chunk in response.iter_content(chunk_size=transport.chunk_size):
+                            text = decoder.decode(chunk)
+                            parser.feed(text)
+                            out.write(text)
+                        text = decoder.decode(b'', final=True)
+                        parser.feed(text)
+                        out.write(text)
+                    parser.close()
+                    os.replace(part, cache_path)
+                finally:
+                    if part.exists():
+                        part.unlink()
+                save_validators(cache_path, response)
+                return 200, False, parser.links
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            if attempt >= policy.max_attempts:
+                raise
+            time.sleep(policy.delay(attempt))
+
+def discover_programs(start_url: str, transport: Transport, cache_dir: Path, ui: ScraperUI,
+                      years: Optional[List[int]] = None, max_pages: int = MAX_DISCOVERY_PAGES,
+                      budget: Optional[Budget] = None) -> dict:
+    """
+    Crawl the archive's listing pages breadth-first from `start_url` and
+    collect the program PDFs they link to - the real URLs, so nothing has to
+    be guessed.
+
+    Only pages on the same host and under the start page's directory are
+    followed; PDFs are collected wherever they are. `years` narrows what is
+    kept, not what is crawled.
+
+    Returns:
+        {'programs': {(year, ensemble): url}, 'pages', 'unchanged', 'errors',
+        'unvisited', 'stopped'} - ensemble is the name as the URL spells it, and
+        'stopped' says why any pages were left unvisited
+    """
+    pattern = program_link_pattern()
+    start_url = urldefrag(start_url)[0]
+    start = urlsplit(start_url)
+    scope = start.path.rsplit('/', 1)[0] + '/'
+    wanted = set(years) if years is not None else None
+
+    pending = deque([start_url])
+    seen = {start_url}
+    report = {'programs': {}, 'pages': 0, 'unchanged': 0, 'errors': 0, 'unvisited': 0,
+              'stopped': "--discover-pages limit"}
+    programs = report['programs']
+    while pending and report['pages'] < max_pages:
+        spent = budget.spent() if budget is not None else None
+        if spent:
+            report['stopped'] = f"budget of {spent} spent"
+            break
+        url = pending.popleft()
+        report['pages'] += 1
+        try:
+            status, unchanged, links = fetch_listing(url, transport, cache_dir)
+        except requests.exceptions.RequestException as e:
+            report['errors'] += 1
+            ui.print_listing_page(url, None, error=type(e).__name__)
+            continue
+        if status != 200:
+            report['errors'] += 1
+        report['unchanged'] += unchanged
+
+        found = 0
+        for link in links:
+            link = urldefrag(link)[0]
+            target = urlsplit(link)
+            match = pattern.search(unquote(target.path))
+            if match:
+                year = int(match.group('year'))
+                key = (year, match.group('ensemble'))
+                if (wanted is None or year in wanted) and key not in programs:
+                    programs[key] = link
+                    found += 1
+            elif (target.scheme in ('http', 'https') and target.netloc == start.netloc
+                  and target.path.startswith(scope) and not NOT_A_PAGE.search(target.path)
+                  and link not in seen):
+                seen.add(link)
+                pending.append(link)
+        ui.print_listing_page(url, status, found, unchanged)
+    report['unvisited'] = len(pending)
+    return report
+
+def merge_ensemble_list(filepath: str, names: Iterable[str], aliases: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """
+    Append the names an ensemble list doesn't have yet (counting aliases of
+    names it has) under a dated comment. Returns the names added.
+    """
+    try:
+        existing = load_ensemble_list(filepath)
+    except FileNotFoundError:
+        existing = []
+    known = set(existing)
+    for name in existing:
+        known.update((aliases or {}).get(name, ()))
+    added = [name for name in dict.fromkeys(names) if name not in known]
+    if not added:
+        return added
+
+    with open(filepath, 'a+') as f:
+        f.seek(0)
+        text = f.read()
+        prefix = '\n' if text and not text.endswith('\n') else ''
+        f.write(f"{prefix}\n# Found by --discover on {datetime.now():%Y-%m-%d}\n" + ''.join(f"{name}\n" for name in added))
+    return added
+
+# ============================================================================
+# DAEMON
+# ============================================================================
+
+class EventStream:
+    """
+    Newline-delimited JSON events to one daemon client.
+
+    Also file-like, so a ScraperUI can print straight into it: every printed
+    line goes out as an {"type": "output"} event. If the client hangs up we
+    just stop sending - its jobs still finish.
+    """
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+        self._buffer = ""
+        self._lock = threading.RLock()
+        self.closed = False
+
+    def send(self, event: dict):
+        with self._lock:
+            if self.closed:
+                return
+            try:
+                self._wfile.write((json.dumps(event) + "\n").encode())
+                self._wfile.flush()
+            except OSError:
+                self.closed = True
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split("\n")
+            for line in lines:
+                self.send({'type': 'output', 'text': line})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+class InFlightJobs:
+    """
+    The (year, ensemble) jobs running right now, across every daemon batch.
+
+    Two clients asking for the same program at once would otherwise both
+    download it into the same .part file. The second claim() waits for the
+    first to finish instead; its own run then finds the file already there
+    (or the 404 already cached) and costs next to nothing.
+    """
+
+    def __init__(self):
+        self._running = {}  # job -> Event, set when it finishes
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def claim(self, job: Tuple[int, str]):
+        while True:
+            with self._lock:
+                finished = self._running.get(job)
+                if finished is None:
+                    finished = self._running[job] = threading.Event()
+                    break
+            finished.wait()
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._running[job]
+            finished.set()
+
+def jobs_from_request(request: dict) -> List[Tuple[int, str]]:
+    """The (year, ensemble) grid a daemon client asked for, same rules as the CLI."""
+    if request.get('years'):
+        years = parse_year_range(str(request['years']))
+    elif request.get('year') is not None:
+        years = [int(request['year'])]
+    else:
+        raise ValueError("Must specify year or years")
+
+    if request.get('list'):
+        ensembles = load_ensemble_list(request['list'])
+    elif request.get('ensemble'):
+        ensembles = [str(request['ensemble'])]
+    else:
+        raise ValueError("Must specify ensemble or list")
+
+    return [(year, ensemble) for year in years for ensemble in ensembles]
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    """One client connection: one JSON request line in, a stream of events out."""
+
+    def handle(self):
+        stream = EventStream(self.wfile)
+        try:
+            request = json.loads(self.rfile.readline())
+            if not isinstance(request, dict):
+                raise ValueError
+        except ValueError:
+            stream.send({'type': 'error', 'message': 'Request must be one line of JSON'})
+            return
+        self.server.scraper_daemon.handle(request, stream)
+
+class ScraperDaemon:
+    """
+    Keeps one warm Transport, manifest, negative cache and metrics alive and
+    runs job batches that clients (see scraper_client.py) submit over a Unix
+    socket. A small request then costs a round trip instead of an interpreter
+    start, a `requests` import and a cold connection.
+
+    Requests are one JSON line, e.g. {"op": "download", "year": 2009,
+    "ensemble": "Buchholz"}; the answer is a stream of JSON lines ending in
+    "done" or "error". Batches from different clients run side by side and
+    share the rate limit, retry policy and circuit breaker.
+    """
+
+    def __init__(self, socket_path: Path, transport: Transport, manifest: Manifest,
+                 negative_cache: Optional[NegativeCache] = None, metrics: Optional[Metrics] = None,
+                 workers: int = DEFAULT_WORKERS, checkpoint=None, store: Optional[BlobStore] = None,
+                 extractor: Optional[extraction.ExtractionPipeline] = None,
+                 resolver: Optional[NameResolver] = None, links: Optional[DiscoveredLinks] = None):
+        self.socket_path = Path(socket_path)
+        self.transport = transport
+        self.manifest = manifest
+        self.negative_cache = negative_cache
+        self.metrics = metrics
+        self.store = store
+        self.extractor = extractor
+        self.resolver = resolver
+        self.links = links
+        self.workers = workers
+        self.checkpoint = checkpoint  # called after each batch to persist caches and metrics
+        self.in_flight = InFlightJobs()  # so overlapping batches never download the same program twice at once
+        self.started = time.time()
+        self.active_batches = 0
+        self.batches = 0
+        self.jobs = 0
+        self._server = None
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+
+    def _claim_socket(self):
+        """Remove a stale socket file, but never steal one a live daemon is using."""
+        if not self.socket_path.exists():
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            self.socket_path.unlink()
+        else:
+            raise RuntimeError(f"Another daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def serve_forever(self):
+        """Listen until a client sends {"op": "shutdown"} (or we get Ctrl+C/SIGTERM)."""
+        self._claim_socket()
+        self._server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), _DaemonHandler)
+        self._server.daemon_threads = True
+        self._server.scraper_daemon = self
+        os.chmod(self.socket_path, 0o600)  # Only we get to queue downloads
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def status(self) -> dict:
+        with self._lock:
+            return {'type': 'status', 'pid': os.getpid(), 'uptime': round(time.time() - self.started, 3),
+                    'active_batches': self.active_batches, 'batches': self.batches, 'jobs': self.jobs,
+                    'socket': str(self.socket_path)}
+
+    def handle(self, request: dict, stream: EventStream):
+        op = request.get('op', 'download')
+        if op == 'status':
+            stream.send(self.status())
+        elif op == 'shutdown':
+            stream.send({'type': 'done'})
+            # shutdown() waits for serve_forever, which is waiting for us
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        elif op == 'download':
+            try:
+                jobs = jobs_from_request(request)
+            except FileNotFoundError:
+                stream.send({'type': 'error', 'message': f"File not found: {request.get('list')}"})
+                return
+            except (ValueError, TypeError) as e:
+                stream.send({'type': 'error', 'message': str(e) or 'Bad year or ensemble'})
+                return
+            self.run_batch(jobs, request, stream)
+        else:
+            stream.send({'type': 'error', 'message': f"Unknown op: {op}"})
+
+    def run_batch(self, jobs: List[Tuple[int, str]], request: dict, stream: EventStream):
+        """Run one client's jobs on the shared transport, streaming the UI back to it."""
+        ui = ScraperUI(boring=bool(request.get('boring')), chaos=bool(request.get('chaos')),
+                       live=False, out=stream)
+        stats = Stats()
+        stats.total = len(jobs)
+        refresh = bool(request.get('refresh'))
+        if not refresh:
+            satisfied = self.manifest.satisfied()
+            pending = [job for job in jobs if job not in satisfied]
+            stats.add_skip(len(jobs) - len(pending))
+            jobs = pending
+        jobs = JobScheduler(jobs, hits=self.manifest.satisfied(),
+                            misses=self.negative_cache.misses() if self.negative_cache is not None else ())
+
+        with self._lock:
+            self.active_batches += 1
+        try:
+            with ui.rendering():
+                run_jobs(jobs, ui, stats, self.transport, workers=self.workers,
+                         negative_cache=self.negative_cache, refresh=refresh, manifest=self.manifest,
+                         metrics=self.metrics, store=self.store, extractor=self.extractor,
+                         resolver=self.resolver, in_flight=self.in_flight, links=self.links)
+        except Exception as e:
+            # The client would otherwise see the stream end as if all went well
+            stream.send({'type': 'error', 'message': f"Batch failed: {type(e).__name__}: {e}"})
+            raise  # socketserver logs the traceback on the daemon's side
+        finally:
+            with self._lock:
+                self.active_batches -= 1
+                self.batches += 1
+                self.jobs += len(jobs)
+            if self.checkpoint is not None:
+                with self._checkpoint_lock:
+                    self.checkpoint()
+
+        ui.print_summary(stats)
+        stream.send({'type': 'done', 'stats': stats.to_dict()})
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+def format_queue_counts(counts: Dict[str, int]) -> str:
+    return (f"🗂️  Queue: {counts['done']} done, {counts['failed']} failed, {counts['pending']} pending, "
+            f"{counts['leased']} in progress elsewhere")
+
+def update_search_index():
+    """Index whatever --extract has added to the dataset since last time."""
+    added = search_index.update_index(Path(OUTPUT_DIR) / REPERTOIRE_FILE, Path(OUTPUT_DIR) / SEARCH_INDEX_DIR)
+    if added:
+        print(f"🔎 Search index: {added} programs added")
+
+def without_jobs(jobs, drop: set):
+    """`jobs` (a JobGrid or a list) minus the ones in `drop`."""
+    if isinstance(jobs, JobGrid):
+        return jobs.without(drop)
+    return [job for job in jobs if job not in drop]
+
+def journal_spec(args: argparse.Namespace) -> dict:
+    """The options that decide a run's jobs, as --resume will need them (paths made absolute)."""
+    return {'year': args.year, 'years': args.years, 'ensemble': args.ensemble,
+            'list': os.path.abspath(args.ensemble_list) if args.ensemble_list else None,
+            'from_probe': os.path.abspath(args.from_probe) if args.from_probe else None,
+            'refresh': args.refresh}
+
+def prepare_jobs(args: argparse.Namespace, ui: ScraperUI, stats: Stats, manifest: Manifest,
+                 done: frozenset = frozenset(), events: Optional[EventLog] = None):
+    """
+    Turn the command line into the job grid (a lazy JobGrid, or a list for
+    --from-probe), announce it, and drop what an interrupted run already
+    did (`done`, for --resume) and what the manifest already has (each one
+    reported to `events` as skipped).
+    """
+    # Parse years
+    years = None
+    if args.years:
+        years = parse_year_range(args.years)
+    elif args.year:
+        years = [args.year]
+
+    # Parse ensembles
+    ensembles = None
+    if args.ensemble_list:
+        try:
+            ensembles = load_ensemble_list(args.ensemble_list)
+        except FileNotFoundError:
+            print(f"Error: File not found: {args.ensemble_list}")
+            sys.exit(1)
+    elif args.ensemble:
+        ensembles = [args.ensemble]
+
+    # Build the job grid (a probe matrix says exactly which ones exist)
+    if args.from_probe:
+        try:
+            jobs = load_probe_hits(args.from_probe)
+        except (FileNotFoundError, ValueError, KeyError, StopIteration):
+            print(f"Error: Can't read probe matrix: {args.from_probe}")
+            sys.exit(1)
+        jobs = [(year, ensemble) for year, ensemble in jobs
+                if (years is None or year in years) and (ensembles is None or ensemble in ensembles)]
+        years = sorted({year for year, _ in jobs})
+        ensembles = list(dict.fromkeys(ensemble for _, ensemble in jobs))
+    else:
+        jobs = JobGrid(years, ensembles)
+
+    # Show startup banner
+    ui.print_startup()
+
+    total_jobs = len(jobs)
+    stats.total = total_jobs
+
+    print(f"\n{ui._colorize(f'📋 Jobs queued: {total_jobs}', Colors.BOLD)}")
+    print(f"{ui._colorize(f'📅 Years: {len(years)}', Colors.BOLD)}")
+    print(f"{ui._colorize(f'🎺 Ensembles: {len(ensembles)}', Colors.BOLD)}")
+    if args.workers > 1:
+        print(f"{ui._colorize(f'👷 Workers: {args.workers}', Colors.BOLD)}")
+
+    # Drop what the run we're resuming got through (its outcomes are already in stats)
+    if done:
+        pending = without_jobs(jobs, done)
+        print(f"{ui._colorize(f'📓 Already done before the interruption: {len(jobs) - len(pending)}', Colors.BOLD)}")
+        jobs = pending
+
+    # Drop everything the manifest says we already have, in one go
+    # (--refresh wants to revalidate those, and --probe asks the server anyway)
+    if not (args.refresh or args.probe):
+        have = manifest.satisfied()
+        pending = without_jobs(jobs, have)
+        if len(pending) < len(jobs):
+            stats.add_skip(len(jobs) - len(pending))
+            if events is not None:
+                # Walk the manifest's side, not the grid's - it's the smaller one
+                grid = jobs if isinstance(jobs, JobGrid) else set(jobs)
+                for year, ensemble in sorted(job for job in have if job in grid):
+                    events.skipped((year, ensemble), Path(OUTPUT_DIR) / str(year) / program_filename(year, ensemble))
+            print(f"{ui._colorize(f'📒 Already in manifest: {len(jobs) - len(pending)}', Colors.BOLD)}")
+        jobs = pending
+    print()
+    return jobs
+
+def main():
+    stdout = sys.stdout
+    try:
+        _main()
+    finally:
+        sys.stdout = stdout  # --output jsonl points it at stderr for the run
+
+def _main():
+    parser = argparse.ArgumentParser(
+        description='Midwest Clinic Concert Program Scraper with MAXIMUM PERSONALITY',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --year 2009 --ensemble Buchholz
+  %(prog)s --years 2015-2023 --ensemble USAF
+  %(prog)s --list ensemble_lists/known_ensembles.txt --years 2010-2023
+  %(prog)s --year 2019 --ensemble NorthTexas --boring
+  %(prog)s --year 2019 --ensemble USAF --chaos
+  %(prog)s --years 2010-2023 --ensemble NorthTexas --resolve
+  %(prog)s --list ensemble_lists/known_ensembles.txt --years 2000-2023 --workers 4
+  %(prog)s --list ensemble_lists/known_ensembles.txt --years 2000-2023 --max-requests 500
+  %(prog)s --list ensemble_lists/known_ensembles.txt --years 2000-2023 --probe availability.csv
+  %(prog)s --from-probe availability.csv
+  %(prog)s --discover discovered.csv --years 2010-2023 --merge-list ensemble_lists/known_ensembles.txt
+  %(prog)s --serve --workers 4   (then: python scraper_client.py --year 2009 --ensemble Buchholz)
+  %(prog)s --queue /shared/jobs.sqlite3 --years 2000-2023 --list ensemble_lists/known_ensembles.txt --enqueue-only
+  %(prog)s --queue /shared/jobs.sqlite3 --workers 4   (on every host)
+        """
+    )
+
+    parser.add_argument('--year', type=int, help='Single year to download')
+    parser.add_argument('--years', type=str, help='Year range (e.g., 2015-2023)')
+    parser.add_argument('--ensemble', type=str, help='Single ensemble name')
+    parser.add_argument('--list', type=str, dest='ensemble_list', help='File with ensemble names (one per line)')
+    parser.add_argument('--boring', action='store_true', help='Disable all the fun (WHY?!)')
+    parser.add_argument('--chaos', action='store_true', help='Turn EVERYTHING up to 11')
+    parser.add_argument('--output', choices=('text', 'jsonl'), default='text',
+                        help='text: the full show. jsonl: one JSON line per job and a summary line, '
+                             'for other programs (default: text)')
+    parser.add_argument('--output-file', type=str, metavar='FILE',
+                        help='Write the --output jsonl events here instead of stdout')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of concurrent downloads (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--rate', type=float, default=1.0 / RATE_LIMIT_DELAY,
+                        help=f'Max requests per second across all workers (default: {1.0 / RATE_LIMIT_DELAY:g})')
+    parser.add_argument('--max-bandwidth', type=str, metavar='RATE',
+                        help='Cap download bytes/second across all transfers, shared fairly between them '
+                             '(e.g. 500K, 2M; independent of --rate)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Let the request rate follow server latency and 429/503s (starts at --rate)')
+    parser.add_argument('--min-rate', type=float, default=ADAPTIVE_MIN_RATE,
+                        help=f'Floor for --adaptive, requests per second (default: {ADAPTIVE_MIN_RATE:g})')
+    parser.add_argument('--max-rate', type=float, default=ADAPTIVE_MAX_RATE,
+                        help=f'Ceiling for --adaptive, requests per second (default: {ADAPTIVE_MAX_RATE:g})')
+    parser.add_argument('--target-latency', type=float, default=TARGET_LATENCY,
+                        help=f'Seconds to first byte above which --adaptive backs off (default: {TARGET_LATENCY:g})')
+    parser.add_argument('--retries', type=int, default=MAX_ATTEMPTS - 1,
+                        help=f'Extra tries for timeouts, dropped connections and retryable statuses (default: {MAX_ATTEMPTS - 1})')
+    parser.add_argument('--retry-backoff', type=float, default=RETRY_BACKOFF,
+                        help=f'Seconds before the first retry, doubling each time, with jitter (default: {RETRY_BACKOFF:g})')
+    parser.add_argument('--retry-status', type=str, default=','.join(str(code) for code in RETRYABLE_STATUSES),
+                        help=f'Comma-separated HTTP statuses worth retrying (default: {",".join(str(code) for code in RETRYABLE_STATUSES)})')
+    parser.add_argument('--breaker-threshold', type=int, default=BREAKER_THRESHOLD,
+                        help=f'Consecutive connection failures that pause the whole batch, 0 to disable (default: {BREAKER_THRESHOLD})')
+    parser.add_argument('--breaker-cooldown', type=float, default=BREAKER_COOLDOWN,
+                        help=f'Seconds to pause before probing a server that looks down (default: {BREAKER_COOLDOWN:g})')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'Bytes per streamed read when saving PDFs (default: {CHUNK_SIZE})')
+    parser.add_argument('--pool-size', type=int,
+                        help='Max pooled keep-alive connections (default: one per worker)')
+    parser.add_argument('--miss-ttl', type=float, default=RECENT_MISS_TTL / 3600,
+                        help=f'Hours before a cached 404 for a recent year is re-checked (default: {RECENT_MISS_TTL / 3600:g})')
+    parser.add_argument('--settled-miss-ttl', type=float,
+                        help=f'Days before a cached 404 for a year {SETTLED_YEAR_AGE}+ years old is re-checked (default: never)')
+    parser.add_argument('--no-miss-cache', action='store_true',
+                        help='Ignore the negative cache and ask about every combination')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Revalidate existing files (ETag/Last-Modified) and re-download only changed ones')
+    parser.add_argument('--resolve', action='store_true',
+                        help='When a program 404s, try other spellings of the ensemble name (case, separators, '
+                             f'--aliases) and remember the one that works in {OUTPUT_DIR}/{RESOLVED_NAMES_FILE}')
+    parser.add_argument('--aliases', type=str, metavar='FILE',
+                        help=f'Other names ensembles were published under, for --resolve (default: {ALIASES_FILE} if present)')
+    parser.add_argument('--max-requests', type=int, metavar='N',
+                        help="Stop starting new jobs after N HTTP requests (likeliest hits run first, so they're the ones you get)")
+    parser.add_argument('--max-time', type=float, metavar='SECONDS',
+                        help='Stop starting new jobs after this many seconds')
+    parser.add_argument('--grid-order', action='store_true',
+                        help="Run jobs year by year in list order instead of likeliest hits first")
+    parser.add_argument('--resume', action='store_true',
+                        help=f'Continue the last batch run from {OUTPUT_DIR}/{JOURNAL_FILE}: same jobs, minus the ones '
+                             'it got through, with its totals restored')
+    parser.add_argument('--force', action='store_true',
+                        help="Start a new batch run even though the last one never finished (its journal is replaced)")
+    parser.add_argument('--probe', type=str, metavar='FILE',
+                        help='Only check which programs exist (HEAD requests) and write a year x ensemble matrix (.csv or .json)')
+    parser.add_argument('--from-probe', type=str, metavar='FILE',
+                        help='Download only the hits from a --probe matrix (optionally narrowed by --year(s)/--ensemble/--list)')
+    parser.add_argument('--discover', type=str, metavar='FILE',
+                        help="Crawl the archive's listing pages for the programs they link to and write them as a "
+                             "--from-probe job list (.csv or .json), optionally only for --year(s)")
+    parser.add_argument('--archive-url', type=str, default=ARCHIVE_URL,
+                        help=f'Page --discover starts from; it follows links under it (default: {ARCHIVE_URL})')
+    parser.add_argument('--discover-pages', type=int, default=MAX_DISCOVERY_PAGES,
+                        help=f'Most listing pages --discover reads (default: {MAX_DISCOVERY_PAGES})')
+    parser.add_argument('--merge-list', type=str, metavar='FILE',
+                        help='Also append the ensembles --discover found that aren\'t in this list file yet')
+    parser.add_argument('--metrics-json', type=str, metavar='FILE',
+                        help='Write per-phase timing histograms and counters as JSON at the end of the run')
+    parser.add_argument('--metrics-prom', type=str, metavar='FILE',
+                        help='Write the same metrics in Prometheus text format (e.g. for a node_exporter textfile collector)')
+    parser.add_argument('--rebuild-manifest', action='store_true',
+                        help=f'Re-sync {OUTPUT_DIR}/{MANIFEST_FILE} with the files on disk (works without --year/--ensemble)')
+    parser.add_argument('--dedupe', action='store_true',
+                        help=f'Store identical PDFs once under {OUTPUT_DIR}/{BLOB_DIR}/ and hard-link them into place '
+                             '(converts what is on disk; later downloads stay deduplicated; works on its own)')
+    parser.add_argument('--extract', action='store_true',
+                        help=f'Extract text and repertoire from each PDF as it lands into {OUTPUT_DIR}/{REPERTOIRE_FILE} '
+                             '(on its own: every program in the manifest not done yet; needs pypdf)')
+    parser.add_argument('--extract-workers', type=int,
+                        help='Processes for --extract (default: one per CPU core)')
+    parser.add_argument('--index', action='store_true',
+                        help=f'Add newly extracted text to the {OUTPUT_DIR}/{SEARCH_INDEX_DIR}/ search index '
+                             '(after the run, or after each --serve batch; works on its own; see search_index.py)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run as a daemon that keeps connections and caches warm and takes jobs from scraper_client.py')
+    parser.add_argument('--socket', type=str, default=str(Path(OUTPUT_DIR) / DAEMON_SOCKET),
+                        help=f'Unix socket for --serve (default: {Path(OUTPUT_DIR) / DAEMON_SOCKET})')
+    parser.add_argument('--queue', type=str, metavar='FILE',
+                        help='Share the jobs with other processes/hosts through this SQLite work queue: '
+                             '--year(s)/--list add jobs to it, then every process pointed at it drains it together')
+    parser.add_argument('--enqueue-only', action='store_true',
+                        help='Just add the jobs to --queue and exit (leave the downloading to the workers)')
+    parser.add_argument('--lease', type=float, default=LEASE_SECONDS,
+                        help=f'Seconds a --queue job stays ours without a heartbeat before others may take it '
+                             f'(default: {LEASE_SECONDS})')
+
+    args = parser.parse_args()
+
+    # --resume takes its jobs from the journal of the run it continues
+    resumed = None
+    if args.resume:
+        if args.year or args.years or args.ensemble or args.ensemble_list or args.from_probe:
+            parser.error("--resume continues the journaled run's jobs - leave out --year(s)/--ensemble/--list/--from-probe")
+        if args.probe or args.queue or args.serve or args.discover:
+            parser.error("--resume is for download runs, not --probe, --queue, --serve or --discover")
+        resumed = Journal.replay(Path(OUTPUT_DIR) / JOURNAL_FILE)
+        if resumed is None:
+            parser.error(f"Nothing to resume: no journal at {Path(OUTPUT_DIR) / JOURNAL_FILE}")
+        if resumed['finished']:
+            print("📓 The last run finished - nothing to resume")
+            return
+        spec = resumed['run']['jobs']
+        args.year, args.years, args.ensemble = spec['year'], spec['years'], spec['ensemble']
+        args.ensemble_list, args.from_probe, args.refresh = spec['list'], spec['from_probe'], spec['refresh']
+
+    # Validate arguments
+    has_jobs = bool((args.year or args.years) and (args.ensemble or args.ensemble_list)) or bool(args.from_probe)
+    if not has_jobs and not (args.rebuild_manifest or args.dedupe or args.extract or args.index or args.serve
+                             or args.queue or args.discover):
+        if not (args.year or args.years):
+            parser.error("Must specify --year or --years")
+        parser.error("Must specify --ensemble or --list")
+
+    # Starting a run replaces the journal - not while --resume could still continue the last one
+    journaled = has_jobs and not (args.serve or args.probe or args.queue or args.discover)
+    if journaled and not (args.resume or args.force) and Journal.unfinished(Path(OUTPUT_DIR) / JOURNAL_FILE):
+        parser.error(f"The last batch run never finished ({Path(OUTPUT_DIR) / JOURNAL_FILE}) - "
+                     "--resume it, or pass --force to start a new one anyway")
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    max_bandwidth = None
+    if args.max_bandwidth is not None:
+        try:
+            max_bandwidth = parse_byte_rate(args.max_bandwidth)
+        except ValueError:
+            max_bandwidth = 0
+        if max_bandwidth <= 0:
+            parser.error("--max-bandwidth must be a positive rate like 500K or 2M")
+
+    if args.adaptive and not 0 < args.min_rate <= args.max_rate:
+        parser.error("--min-rate must be positive and no more than --max-rate")
+
+    if args.retries < 0:
+        parser.error("--retries can't be negative")
+
+    try:
+        retry_statuses = [int(code) for code in args.retry_status.split(',') if code.strip()]
+    except ValueError:
+        parser.error("--retry-status must be comma-separated status codes (e.g. 429,503)")
+
+    if args.breaker_threshold < 0 or args.breaker_cooldown <= 0:
+        parser.error("--breaker-threshold can't be negative and --breaker-cooldown must be positive")
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    if args.pool_size is not None and args.pool_size < 1:
+        parser.error("--pool-size must be at least 1")
+
+    if args.miss_ttl < 0 or (args.settled_miss_ttl is not None and args.settled_miss_ttl < 0):
+        parser.error("miss TTLs can't be negative")
+
+    if (args.max_requests is not None and args.max_requests < 1) or (args.max_time is not None and args.max_time <= 0):
+        parser.error("--max-requests and --max-time must be positive")
+
+    if args.aliases and not args.resolve:
+        parser.error("--aliases only matters with --resolve")
+
+    if args.probe and args.from_probe:
+        parser.error("--probe and --from-probe don't mix (probe first, then download)")
+
+    if args.discover:
+        if args.ensemble or args.ensemble_list or args.from_probe:
+            parser.error("--discover finds the ensembles itself - leave out --ensemble/--list/--from-probe "
+                         "(use --merge-list to add what it finds to a list)")
+        if args.probe or args.serve or args.queue:
+            parser.error("--discover doesn't mix with --probe, --serve or --queue")
+        if args.discover_pages < 1:
+            parser.error("--discover-pages must be at least 1")
+    elif args.merge_list:
+        parser.error("--merge-list only matters with --discover")
+
+    if args.output == 'jsonl':
+        if not (has_jobs or args.queue) or args.probe or args.discover or args.serve or args.enqueue_only:
+            parser.error("--output jsonl reports download runs - not --probe, --discover, --serve or --enqueue-only "
+                         "(daemon clients get events already)")
+    elif args.output_file:
+        parser.error("--output-file only matters with --output jsonl")
+
+    if args.extract and extraction.pypdf is None:
+        parser.error("--extract needs the pypdf package (pip install pypdf)")
+
+    if args.extract_workers is not None and args.extract_workers < 1:
+        parser.error("--extract-workers must be at least 1")
+
+    if args.queue:
+        if args.serve or args.probe:
+            parser.error("--queue is for download runs, not --serve or --probe")
+        if args.lease <= 0:
+            parser.error("--lease must be positive")
+    if args.enqueue_only and not (args.queue and has_jobs):
+        parser.error("--enqueue-only needs --queue and some jobs (--year(s) with --ensemble/--list)")
+
+    if args.serve:
+        if has_jobs or args.probe:
+            parser.error("--serve takes its jobs from scraper_client.py, not the command line")
+        if args.max_requests or args.max_time:
+            parser.error("--max-requests and --max-time are for a single run, not --serve")
+        if not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+            parser.error("--serve needs Unix domain sockets, which this platform doesn't have")
+
+    # --output jsonl owns stdout: the events go there (or to --output-file), anything else to stderr
+    events = None
+    if args.output == 'jsonl':
+        try:
+            events = EventLog(open(args.output_file, 'w', encoding='utf-8') if args.output_file else sys.stdout)
+        except OSError as e:
+            print(f"Error: Can't write events to {args.output_file}: {e.strerror}")
+            sys.exit(1)
+        sys.stdout = sys.stderr  # Put back by main()
+
+    # Load the manifest (a brand new one adopts whatever is already on disk)
+    manifest = Manifest(Path(OUTPUT_DIR) / MANIFEST_FILE)
+    if manifest.created or args.rebuild_manifest:
+        count = manifest.rebuild(Path(OUTPUT_DIR))
+        if args.rebuild_manifest:
+            print(f"📒 Manifest rebuilt: {count} programs in /{OUTPUT_DIR}/")
+
+    # Deduplicate into the blob store (once it exists, new downloads go into it too)
+    store = None
+    blob_dir = Path(OUTPUT_DIR) / BLOB_DIR
+    if args.dedupe or blob_dir.is_dir():
+        store = BlobStore(blob_dir)
+    if args.dedupe:
+        report = dedupe_programs(Path(OUTPUT_DIR), store)
+        print(f"🔗 Deduplicated {report['programs']} programs into {report['blobs']} blobs: "
+              f"{report['duplicates']} duplicates linked, {format_bytes(report['bytes_saved'])} saved"
+              + (f", {report['pruned']} unused blobs pruned" if report['pruned'] else ""))
+
+    # Text extraction runs alongside the downloads (on its own, it catches up on the whole manifest)
+    extractor = None
+    if args.extract:
+        extractor = extraction.ExtractionPipeline(Path(OUTPUT_DIR) / REPERTOIRE_FILE, workers=args.extract_workers)
+        if not (has_jobs or args.serve or args.queue or args.discover):
+            try:
+                for year, ensemble, path, sha256 in manifest.programs():
+                    extractor.submit(year, ensemble, Path(path), sha256)
+            finally:
+                extractor.close()
+            print(extractor.summary())
+    if not (has_jobs or args.serve or args.queue or args.discover):
+        manifest.close()
+        if args.index:
+            update_search_index()
+        return
+
+    # Initialize UI and stats
+    ui = ScraperUI(boring=args.boring or events is not None, chaos=args.chaos, quiet=events is not None)
+    stats = Stats()
+
+    if args.serve:
+        ui.print_startup()
+        print(f"\n{ui._colorize(f'🛎️  Listening on {args.socket}', Colors.BOLD)}")
+        print(f"{ui._colorize(f'👷 Workers per batch: {args.workers}', Colors.BOLD)}\n")
+        jobs = []
+    elif has_jobs:
+        if resumed is not None:
+            stats.merge(dict(resumed['stats']))
+        jobs = prepare_jobs(args, ui, stats, manifest, done=frozenset(resumed['done']) if resumed else frozenset(),
+                            events=events)
+    else:
+        ui.print_startup()  # A --queue worker (the jobs are already in the queue), or --discover
+        jobs = []
+
+    # Main download loop (rate limiting keeps us good citizens)
+    if args.adaptive:
+        limiter = AdaptiveRateLimiter(rate=args.rate, min_rate=args.min_rate, max_rate=args.max_rate,
+                                      target_latency=args.target_latency)
+    else:
+        limiter = TokenBucket(rate=args.rate)
+    pool_size = args.pool_size or args.workers
+    retry_policy = RetryPolicy(max_attempts=args.retries + 1, backoff=args.retry_backoff,
+                               retryable_statuses=retry_statuses)
+    breaker = None
+    if args.breaker_threshold:
+        breaker = CircuitBreaker(threshold=args.breaker_threshold, cooldown=args.breaker_cooldown,
+                                 on_open=ui.print_circuit_open, on_close=ui.print_circuit_closed)
+    negative_cache = None
+    if not args.no_miss_cache:
+        settled_ttl = args.settled_miss_ttl * 86400 if args.settled_miss_ttl is not None else None
+        negative_cache = NegativeCache(Path(OUTPUT_DIR) / NEGATIVE_CACHE_FILE,
+                                       recent_ttl=args.miss_ttl * 3600, settled_ttl=settled_ttl)
+    resolver = None
+    if args.resolve:
+        try:
+            aliases = load_aliases(args.aliases or ALIASES_FILE)
+        except FileNotFoundError:
+            if args.aliases:
+                print(f"Error: File not found: {args.aliases}")
+                sys.exit(1)
+            aliases = {}  # The default file is optional
+        resolver = NameResolver(Path(OUTPUT_DIR) / RESOLVED_NAMES_FILE, aliases=aliases)
+    links = DiscoveredLinks(Path(OUTPUT_DIR) / DISCOVERED_LINKS_FILE)
+    metrics = Metrics() if (args.metrics_json or args.metrics_prom) else None
+
+    # Journal every batch run as it goes, so a killed one can be --resume'd
+    journal = None
+    if not (args.serve or args.probe or args.queue or args.discover):
+        journal = Journal(Path(OUTPUT_DIR) / JOURNAL_FILE)
+        if resumed is not None:
+            journal.reopen()
+        else:
+            journal.start(journal_spec(args), stats.total)
+
+    # Likeliest hits first, judging by everything we've seen so far
+    scheduler = None
+    if not args.grid_order:
+        scheduler = JobScheduler(jobs, hits=manifest.satisfied(),
+                                 misses=negative_cache.misses() if negative_cache is not None else ())
+
+    # A shared queue hands out its best job to whichever worker asks next
+    work_queue = lease = None
+    if args.queue:
+        work_queue = WorkQueue(Path(args.queue), lease=args.lease)
+        if jobs:
+            priorities = [scheduler.score(*job) for job in jobs] if scheduler is not None else None
+            added = work_queue.add(jobs, priorities)
+            print(ui._colorize(f"🗂️  Added {added} jobs to {args.queue}", Colors.BOLD))
+        if args.enqueue_only:
+            print(format_queue_counts(work_queue.counts()))
+            work_queue.close()
+            manifest.close()
+            return
+        lease = jobs = QueueLease(work_queue)
+        stats.total = len(lease)  # What was waiting when we started, not just what we added
+        print(ui._colorize(f"🗂️  Working {args.queue} as {lease.owner}: {len(lease)} jobs waiting", Colors.BOLD) + "\n")
+    elif scheduler is not None:
+        jobs = scheduler
+
+    def checkpoint():
+        """Persist what we've learned so far: the caches, the metrics files and the search index."""
+        if negative_cache is not None:
+            negative_cache.save()
+        if resolver is not None:
+            resolver.save()
+        links.save()
+        if metrics is not None:
+            if args.metrics_json:
+                metrics.write(Path(args.metrics_json), 'json')
+            if args.metrics_prom:
+                metrics.write(Path(args.metrics_prom), 'prometheus')
+        if args.index:
+            update_search_index()
+
+    try:
+        bandwidth = BandwidthLimiter(max_bandwidth) if max_bandwidth else None
+        with Transport(pool_size=pool_size, limiter=limiter, chunk_size=args.chunk_size,
+                       retry_policy=retry_policy, breaker=breaker, bandwidth=bandwidth) as transport:
+            if args.serve:
+                daemon = ScraperDaemon(Path(args.socket), transport, manifest, negative_cache=negative_cache,
+                                       metrics=metrics, workers=args.workers, checkpoint=checkpoint,
+                                       store=store, extractor=extractor, resolver=resolver, links=links)
+                signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+                try:
+                    daemon.serve_forever()
+                except KeyboardInterrupt:
+                    pass
+                except RuntimeError as e:
+                    print(f"Error: {e}")
+                    sys.exit(1)
+            else:
+                budget = None
+                if args.max_requests or args.max_time:
+                    budget = Budget(transport, max_requests=args.max_requests, max_time=args.max_time)
+                with ui.rendering():
+                    if args.probe:
+                        results = run_probes(jobs, ui, transport, workers=args.workers, negative_cache=negative_cache,
+                                             resolver=resolver, budget=budget)
+                        write_probe_matrix(results, Path(args.probe))
+                    elif args.discover:
+                        years = parse_year_range(args.years) if args.years else [args.year] if args.year else None
+                        report = discover_programs(args.archive_url, transport, Path(OUTPUT_DIR) / LISTING_CACHE_DIR,
+                                                   ui, years=years, max_pages=args.discover_pages, budget=budget)
+                        links.update(report['programs'])
+                    else:
+                        run_jobs(jobs, ui, stats, transport, workers=args.workers,
+                                 negative_cache=negative_cache, refresh=args.refresh, manifest=manifest,
+                                 metrics=metrics, store=store, extractor=extractor, resolver=resolver,
+                                 budget=budget, journal=journal, events=events, links=links)
+                        if journal is not None and not stats.deferred:
+                            journal.finish()  # A budgeted run leaves the rest for --resume
+    finally:
+        # Even a Ctrl+C'd run learned something (and hands back the queue jobs it didn't get to)
+        if lease is not None:
+            lease.close()
+        if journal is not None:
+            journal.close()
+        if extractor is not None:
+            extractor.close()
+        checkpoint()
+        manifest.close()
+        queue_counts = None
+        if work_queue is not None:
+            queue_counts = work_queue.counts()
+            work_queue.close()
+        if events is not None:
+            events.summary(stats)  # Even for an interrupted run: it's the last thing the reader gets
+            events.close()
+
+    if args.serve:
+        print(ui._colorize(f"🛎️  Daemon stopped after {daemon.batches} batches ({daemon.jobs} jobs)", Colors.BOLD))
+        if extractor is not None:
+            print(extractor.summary())
+        return
+
+    # Show final summary
+    if args.probe:
+        ui.print_probe_summary(results, Path(args.probe))
+    elif args.discover:
+        # Written as a probe matrix of hits, so --from-probe downloads exactly these
+        found = sorted(report['programs'].items())
+        write_probe_matrix([{'year': year, 'ensemble': ensemble, 'url': url, 'status': 200, 'content_length': None,
+                             'cached': False} for (year, ensemble), url in found], Path(args.discover))
+        merged = None
+        if args.merge_list:
+            try:
+                aliases = load_aliases(ALIASES_FILE)
+            except FileNotFoundError:
+                aliases = {}
+            merged = merge_ensemble_list(args.merge_list, (ensemble for (_, ensemble), _ in found), aliases)
+        ui.print_discovery_summary(report, Path(args.discover), merged, args.merge_list)
+    else:
+        ui.print_summary(stats)
+        if extractor is not None:
+            print(extractor.summary())
+        if queue_counts is not None:
+            print(format_queue_counts(queue_counts))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+SCRAPER CLIENT
+Hands jobs to a running `scraper.py --serve` daemon and streams back what
+happened. Standard library only, so it starts in a blink - the daemon is the
+one holding the warm connections, the manifest and the caches.
+
+Usage:
+    python scraper.py --serve --workers 4 &
+    python scraper_client.py --year 2009 --ensemble Buchholz
+    python scraper_client.py --years 2015-2023 --list ensemble_lists/known_ensembles.txt --boring
+    python scraper_client.py --status
+    python scraper_client.py --shutdown
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Same place scraper.py --serve listens by default (OUTPUT_DIR / DAEMON_SOCKET)
+DEFAULT_SOCKET = os.path.join("programs", ".scraper.sock")
+
+def submit(request: dict, socket_path: str):
+    """Send one request to the daemon and yield its events as they arrive."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + "\n").encode())
+        with sock.makefile('rb') as events:
+            for line in events:
+                yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Submit jobs to a running scraper.py --serve daemon')
+    parser.add_argument('--year', type=int, help='Single year to download')
+    parser.add_argument('--years', type=str, help='Year range (e.g., 2015-2023)')
+    parser.add_argument('--ensemble', type=str, help='Single ensemble name')
+    parser.add_argument('--list', type=str, dest='ensemble_list', help='File with ensemble names (one per line)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Revalidate existing files (ETag/Last-Modified) and re-download only changed ones')
+    parser.add_argument('--boring', action='store_true', help='Disable all the fun (WHY?!)')
+    parser.add_argument('--chaos', action='store_true', help='Turn EVERYTHING up to 11')
+    parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET,
+                        help=f'Daemon socket (default: {DEFAULT_SOCKET})')
+    parser.add_argument('--status', action='store_true', help="Show the daemon's pid, uptime and job counts")
+    parser.add_argument('--shutdown', action='store_true', help='Ask the daemon to stop')
+    args = parser.parse_args()
+
+    if args.status:
+        request = {'op': 'status'}
+    elif args.shutdown:
+        request = {'op': 'shutdown'}
+    else:
+        if not (args.year or args.years):
+            parser.error("Must specify --year or --years")
+        if not (args.ensemble or args.ensemble_list):
+            parser.error("Must specify --ensemble or --list")
+        request = {'op': 'download', 'year': args.year, 'years': args.years, 'ensemble': args.ensemble,
+                   # The daemon may be running from somewhere else
+                   'list': os.path.abspath(args.ensemble_list) if args.ensemble_list else None,
+                   'refresh': args.refresh, 'boring': args.boring, 'chaos': args.chaos}
+
+    answered = False  # Every request ends in "done" (a status in "status"); anything short of that failed
+    try:
+        for event in submit(request, args.socket):
+            if event['type'] in ('done', 'status'):
+                answered = True
+            if event['type'] == 'output':
+                print(event['text'], flush=True)
+            elif event['type'] == 'status':
+                for key, value in event.items():
+                    if key != 'type':
+                        print(f"{key}: {value}")
+            elif event['type'] == 'error':
+                print(f"Error: {event['message']}", file=sys.stderr)
+                sys.exit(1)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"Error: No daemon listening on {args.socket} (start one with: python scraper.py --serve)",
+              file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        return  # The daemon finishes the batch anyway
+    if not answered:
+        print("Error: The daemon hung up before the batch finished", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+REPERTOIRE SEARCH INDEX
+An on-disk inverted index over the text that `scraper.py --extract` pulls out
+of the programs, for questions like "who played Lincolnshire Posy, and when?"
+
+The index is a directory of immutable segment files plus a small state.json.
+repertoire.jsonl only ever grows, and each segment covers a byte range of it,
+so an update only indexes the lines added since last time. Queries mmap the
+segments and binary-search them; only the per-segment document tables are
+read into memory, never the postings.
+
+Standard library only, so a query costs milliseconds, not a scraper start.
+
+Usage:
+    python search_index.py --update
+    python search_index.py "festive overture"
+    python search_index.py --composer shostakovitch
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+# Same places scraper.py uses (OUTPUT_DIR / REPERTOIRE_FILE, OUTPUT_DIR / SEARCH_INDEX_DIR)
+DATASET = os.path.join("programs", "repertoire.jsonl")
+INDEX_DIR = os.path.join("programs", "search_index")
+STATE_FILE = "state.json"
+SEGMENT_DOCS = 500  # programs per segment; a small last segment is rebuilt with the next update
+MAX_TERM_LENGTH = 64  # longer "words" are extraction garbage
+
+# Segment layout: header | document table (JSON) | pieces (JSON per doc) | piece offsets |
+# terms and postings | words entries | names entries
+MAGIC = b"MCIDX\x00\x01\x00"
+HEADER = struct.Struct("<8sQQQQQQQ")  # magic, docs offset/length, piece offsets, words offset/count, names offset/count
+PIECES = struct.Struct("<QI")  # offset and length of one doc's pieces
+ENTRY = struct.Struct("<QQI")  # term offset, postings offset, postings count
+POSTING = struct.Struct("<III")  # words: doc, page, position - names: doc, page, piece number
+TERM_LENGTH = struct.Struct("<H")
+
+_WORD = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-free words: "Dvořák's Op. 22" -> ['dvorak', 's', 'op', '22']."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return [word for word in _WORD.findall(text) if len(word) <= MAX_TERM_LENGTH]
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up (returning limit + 1) once it's clearly over `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+def typo_allowance(word: str) -> int:
+    """How many typos a name query word may have: none for short words, two for long ones."""
+    if len(word) <= 3:
+        return 0
+    return 1 if len(word) <= 6 else 2
+
+# ============================================================================
+# SEGMENTS
+# ============================================================================
+
+def write_segment(path: Path, records: List[dict]):
+    """Write one immutable segment for `records` (repertoire.jsonl lines, in order)."""
+    docs = []
+    words = {}  # term -> [(doc, page, position)]
+    names = {}  # composer/arranger term -> [(doc, page, piece number)]
+    pieces_by_doc = []
+    for doc, record in enumerate(records):
+        pieces = record.get('pieces', [])
+        docs.append([record['year'], record['ensemble'], record.get('path')])
+        pieces_by_doc.append(pieces)
+        for page, text in enumerate(record.get('pages', []), 1):
+            for position, term in enumerate(tokenize(text)):
+                words.setdefault(term, []).append((doc, page, position))
+        for number, piece in enumerate(pieces):
+            terms = set(tokenize(piece.get('composer') or '')) | set(tokenize(piece.get('arranger') or ''))
+            for term in terms:
+                names.setdefault(term, []).append((doc, piece.get('page', 0), number))
+
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(b"\0" * HEADER.size)
+        docs_blob = json.dumps(docs, ensure_ascii=False).encode()
+        docs_offset = f.tell()
+        f.write(docs_blob)
+
+        # Pieces are only read for composer hits, so they don't slow down opening the index
+        piece_entries = []
+        for pieces in pieces_by_doc:
+            blob = json.dumps(pieces, ensure_ascii=False).encode()
+            piece_entries.append(PIECES.pack(f.tell(), len(blob)))
+            f.write(blob)
+        pieces_offset = f.tell()
+        f.write(b''.join(piece_entries))
+
+        tables = []
+        for table in (words, names):
+            entries = []
+            for term in sorted(table):
+                postings = sorted(table[term])
+                encoded = term.encode()
+                term_offset = f.tell()
+                f.write(TERM_LENGTH.pack(len(encoded)) + encoded)
+                postings_offset = f.tell()
+                f.write(b''.join(POSTING.pack(*posting) for posting in postings))
+                entries.append(ENTRY.pack(term_offset, postings_offset, len(postings)))
+            tables.append((f.tell(), len(entries)))
+            f.write(b''.join(entries))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, docs_offset, len(docs_blob), pieces_offset, *tables[0], *tables[1]))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class Segment:
+    """One segment file, memory-mapped. Lookups are binary searches over the map."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, docs_offset, docs_length, self._pieces_offset, *tables = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a search index segment")
+        self.docs = json.loads(self._map[docs_offset:docs_offset + docs_length])  # [year, ensemble, path]
+        self._tables = {'words': (tables[0], tables[1]), 'names': (tables[2], tables[3])}
+
+    def pieces(self, doc: int) -> List[dict]:
+        offset, length = PIECES.unpack_from(self._map, self._pieces_offset + doc * PIECES.size)
+        return json.loads(self._map[offset:offset + length])
+
+    def _entry(self, table: str, index: int) -> Tuple[int, int, int]:
+        offset, _ = self._tables[table]
+        return ENTRY.unpack_from(self._map, offset + index * ENTRY.size)
+
+    def _term_at(self, offset: int) -> str:
+        (length,) = TERM_LENGTH.unpack_from(self._map, offset)
+        start = offset + TERM_LENGTH.size
+        return self._map[start:start + length].decode()
+
+    def lookup(self, table: str, term: str) -> Optional[Tuple[int, int]]:
+        """(postings offset, count) for an exact term, or None."""
+        low, high = 0, self._tables[table][1]
+        while low < high:
+            middle = (low + high) // 2
+            term_offset, postings_offset, count = self._entry(table, middle)
+            found = self._term_at(term_offset)
+            if found == term:
+                return postings_offset, count
+            if found < term:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def terms(self, table: str) -> Iterator[Tuple[str, int, int]]:
+        """Every (term, postings offset, count) in a table, in order."""
+        for index in range(self._tables[table][1]):
+            term_offset, postings_offset, count = self._entry(table, index)
+            yield self._term_at(term_offset), postings_offset, count
+
+    def postings(self, postings_offset: int, count: int) -> Iterator[Tuple[int, int, int]]:
+        return POSTING.iter_unpack(self._map[postings_offset:postings_offset + count * POSTING.size])
+
+    def contains(self, postings_offset: int, count: int, posting: Tuple[int, int, int]) -> bool:
+        """Binary search a sorted postings list for one posting."""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            found = POSTING.unpack_from(self._map, postings_offset + middle * POSTING.size)
+            if found == posting:
+                return True
+            if found < posting:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def close(self):
+        self._map.close()
+
+# ============================================================================
+# UPDATING
+# ============================================================================
+
+def load_state(directory: Path) -> dict:
+    try:
+        with open(Path(directory) / STATE_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'version': 1, 'next_id': 1, 'segments': []}
+
+def _save_state(directory: Path, state: dict):
+    path = Path(directory) / STATE_FILE
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _read_records(dataset: Path, start: int, stop: Optional[int] = None,
+                  limit: Optional[int] = None) -> Tuple[List[dict], int]:
+    """
+    Complete JSON lines from byte `start` (up to `stop` or `limit` lines).
+    A last line without its newline is still being written, so it's left for
+    next time.
+
+    Returns:
+        (records, byte offset just past the last complete line read)
+    """
+    records = []
+    with open(dataset, 'rb') as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            if not line.endswith(b"\n") or (stop is not None and offset >= stop):
+                break
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+            if limit is not None and len(records) >= limit:
+                break
+    return records, offset
+
+def update_index(dataset: Path = Path(DATASET), directory: Path = Path(INDEX_DIR)) -> int:
+    """
+    Bring the index up to date with the dataset, indexing only what's new.
+
+    Returns:
+        Number of programs added
+    """
+    dataset, directory = Path(dataset), Path(directory)
+    if not dataset.exists():
+        return 0
+    directory.mkdir(parents=True, exist_ok=True)
+    state = load_state(directory)
+    segments = state['segments']
+    indexed = segments[-1]['end'] if segments else 0
+    if dataset.stat().st_size < indexed:
+        segments, indexed = [], 0  # The dataset was replaced - start over
+
+    added = 0
+    while True:
+        # Top up a small last segment instead of adding another tiny one
+        topping_up = bool(segments) and segments[-1]['docs'] < SEGMENT_DOCS
+        room = SEGMENT_DOCS - segments[-1]['docs'] if topping_up else SEGMENT_DOCS
+        new, end = _read_records(dataset, indexed, limit=room)
+        if not new:
+            break
+        start, carried = indexed, []
+        if topping_up:
+            start = segments[-1]['start']
+            carried, _ = _read_records(dataset, start, stop=indexed)
+        name = f"segment-{state['next_id']:06d}.idx"
+        state['next_id'] += 1
+        write_segment(directory / name, carried + new)
+        if topping_up:
+            segments.pop()
+        segments.append({'file': name, 'start': start, 'end': end, 'docs': len(carried) + len(new)})
+        indexed = end
+        added += len(new)
+
+    state['segments'] = segments
+    _save_state(directory, state)
+
+    # Segments nobody references any more (a reader that already has one open keeps its map)
+    keep = {segment['file'] for segment in segments}
+    for path in directory.glob("segment-*.idx"):
+        if path.name not in keep:
+            path.unlink()
+    return added
+
+# ============================================================================
+# QUERYING
+# ============================================================================
+
+class SearchIndex:
+    """
+    Read side of the index. If a program was extracted more than once (it was
+    re-downloaded with new content), only its newest text counts.
+    """
+
+    def __init__(self, directory: Path = Path(INDEX_DIR)):
+        directory = Path(directory)
+        self.segments = [Segment(directory / segment['file']) for segment in load_state(directory)['segments']]
+        self._latest = {}
+        for segment_index, segment in enumerate(self.segments):
+            for doc_index, (year, ensemble, _) in enumerate(segment.docs):
+                self._latest[(year, ensemble)] = (segment_index, doc_index)
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+    def _current(self, segment_index: int, doc_index: int) -> bool:
+        year, ensemble, _ = self.segments[segment_index].docs[doc_index]
+        return self._latest[(year, ensemble)] == (segment_index, doc_index)
+
+    def phrase(self, text: str) -> List[dict]:
+        """Every program page containing the words of `text`, in order."""
+        terms = tokenize(text)
+        if not terms:
+            return []
+        hits = []
+        for segment_index, segment in enumerate(self.segments):
+            found = [segment.lookup('words', term) for term in terms]
+            if None in found:
+                continue
+            # Walk the rarest word's postings, and binary-search the rest
+            anchor = min(range(len(terms)), key=lambda i: found[i][1])
+            pages = {}
+            for doc, page, position in segment.postings(*found[anchor]):
+                start = position - anchor
+                if start < 0 or not self._current(segment_index, doc):
+                    continue
+                if all(i == anchor or segment.contains(*found[i], (doc, page, start + i)) for i in range(len(terms))):
+                    pages[(doc, page)] = pages.get((doc, page), 0) + 1
+            for (doc, page), matches in pages.items():
+                year, ensemble, path = segment.docs[doc]
+                hits.append({'year': year, 'ensemble': ensemble, 'page': page, 'matches': matches, 'path': path})
+        return sorted(hits, key=lambda hit: (hit['year'], hit['ensemble'], hit['page']))
+
+    def composer(self, name: str) -> List[dict]:
+        """Pieces whose composer or arranger matches every word of `name`, allowing for typos."""
+        words = tokenize(name)
+        if not words:
+            return []
+        hits = []
+        for segment_index, segment in enumerate(self.segments):
+            matched = None
+            for word in words:
+                allowance = typo_allowance(word)
+                pieces = set()
+                for term, postings_offset, count in segment.terms('names'):
+                    if edit_distance(word, term, allowance) <= allowance:
+                        pieces.update((doc, number) for doc, _, number in segment.postings(postings_offset, count))
+                matched = pieces if matched is None else matched & pieces
+                if not matched:
+                    break
+            pieces = {}
+            for doc, number in matched or ():
+                if self._current(segment_index, doc):
+                    if doc not in pieces:
+                        pieces[doc] = segment.pieces(doc)
+                    year, ensemble, _ = segment.docs[doc]
+                    hits.append(dict(pieces[doc][number], year=year, ensemble=ensemble))
+        return sorted(hits, key=lambda hit: (hit['year'], hit['ensemble'], hit.get('page', 0)))
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def format_piece(hit: dict) -> str:
+    credit = hit.get('composer') or ''
+    if hit.get('arranger'):
+        credit = f"{credit} (arr. {hit['arranger']})".strip()
+    return f"{hit.get('title', '?')} - {credit}" if credit else hit.get('title', '?')
+
+def main():
+    parser = argparse.ArgumentParser(description='Search the text extracted from downloaded programs')
+    parser.add_argument('query', nargs='?', help='Words to find, in this order (e.g. "lincolnshire posy")')
+    parser.add_argument('--composer', type=str, help='Find pieces by composer or arranger name (typos allowed)')
+    parser.add_argument('--update', action='store_true', help='Index text extracted since the last update first')
+    parser.add_argument('--dataset', type=str, default=DATASET, help=f'Extracted text to index (default: {DATASET})')
+    parser.add_argument('--index-dir', type=str, default=INDEX_DIR, help=f'Where the index lives (default: {INDEX_DIR})')
+    args = parser.parse_args()
+
+    if not (args.query or args.composer or args.update):
+        parser.error("Give a query, --composer NAME, or --update")
+
+    if args.update:
+        added = update_index(Path(args.dataset), Path(args.index_dir))
+        print(f"🔎 Indexed {added} new programs")
+    if not (args.query or args.composer):
+        return
+
+    if not (Path(args.index_dir) / STATE_FILE).exists():
+        print(f"No index in {args.index_dir} yet - run with --update (after scraper.py --extract)", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    with SearchIndex(Path(args.index_dir)) as index:
+        if args.composer:
+            hits = index.composer(args.composer)
+            lines = [f"{hit['year']}  {hit['ensemble']:<24} p.{hit.get('page', '?'):<3} {format_piece(hit)}"
+                     for hit in hits]
+        else:
+            hits = index.phrase(args.query)
+            lines = [f"{hit['year']}  {hit['ensemble']:<24} p.{hit['page']}" for hit in hits]
+        elapsed = time.perf_counter() - started
+        programs = len(index)
+
+    for line in lines:
+        print(line)
+    print(f"\n{len(hits)} hits across {programs} programs in {elapsed * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    main()